@@ -1,8 +1,11 @@
 from .user import db, User
 from .post import Post
 from .vote import Vote
+from .post_vote_tally import PostVoteTally
 from .monthly_winner import MonthlyWinner
 from .about import About
+from .job import Job
+from .cache_version import CacheVersion
 
-__all__ = ['db', 'User', 'Post', 'Vote', 'MonthlyWinner', 'About']
+__all__ = ['db', 'User', 'Post', 'Vote', 'PostVoteTally', 'MonthlyWinner', 'About', 'Job', 'CacheVersion']
 
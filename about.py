@@ -1,13 +1,22 @@
-from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from src.utils.cache import bump_version_after_commit, get_cache, get_versions, make_cache_key
+from src.utils.render import EXCERPT_LENGTH, render_content
 from datetime import datetime
+from .user import db
 
-db = SQLAlchemy()
+# Upper bound on how long the cached /api/about payload lives; edits reach
+# every process through the shared 'about' version, this only caps a lost bump
+ABOUT_CACHE_TTL = 600
 
 class About(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     section_name = db.Column(db.String(100), unique=True, nullable=False)  # e.g., 'contact', 'history', 'mission'
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
+    # Rendered from content whenever it is set; see src.utils.render
+    content_html = db.Column(db.Text, nullable=True)
+    excerpt = db.Column(db.String(EXCERPT_LENGTH + 1), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -15,19 +24,30 @@ class About(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     display_order = db.Column(db.Integer, default=0)  # For ordering sections
 
+    creator = db.relationship('User', foreign_keys=[created_by], lazy=True)
+    updater = db.relationship('User', foreign_keys=[updated_by], lazy=True)
+
+    @db.validates('content')
+    def _render_content(self, key, content):
+        """Store the rendered HTML and plain-text excerpt alongside new content"""
+        if content is not None:
+            self.content_html, self.excerpt = render_content(content)
+        return content
+
     def __repr__(self):
         return f'<About {self.section_name}>'
 
     def to_dict(self):
-        from .user import User
-        creator = User.query.get(self.created_by)
-        updater = User.query.get(self.updated_by)
+        creator = self.creator
+        updater = self.updater
         
         return {
             'id': self.id,
             'section_name': self.section_name,
             'title': self.title,
             'content': self.content,
+            'content_html': self.content_html,
+            'excerpt': self.excerpt,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'created_by': self.created_by,
@@ -38,10 +58,36 @@ class About(db.Model):
             'updater_name': f"{updater.first_name} {updater.last_name}" if updater else None
         }
 
+    @staticmethod
+    def with_people():
+        """Loader options that fetch each section's creator and updater names in the same statement"""
+        from .user import User
+        
+        return (
+            db.joinedload(About.creator).load_only(User.first_name, User.last_name),
+            db.joinedload(About.updater).load_only(User.first_name, User.last_name),
+        )
+
     @staticmethod
     def get_active_sections():
         """Get all active about sections ordered by display_order"""
-        return About.query.filter_by(is_active=True).order_by(About.display_order.asc()).all()
+        return About.query.options(*About.with_people()).filter_by(is_active=True).order_by(
+            About.display_order.asc()
+        ).all()
+
+    @staticmethod
+    def get_page():
+        """Get the /api/about payload, built once per change to the 'about' scope.
+
+        Section edits and renames of their authors bump 'about' for every
+        process; entries also expire after ABOUT_CACHE_TTL.
+        """
+        key = make_cache_key('about_page', get_versions('about'))
+        page = get_cache().get(key)
+        if page is None:
+            page = {'sections': [section.to_dict() for section in About.get_active_sections()]}
+            get_cache().set(key, page, ttl=ABOUT_CACHE_TTL)
+        return page
 
     @staticmethod
     def get_section_by_name(section_name):
@@ -174,3 +220,10 @@ Merit-based scholarships available for outstanding students. Need-based financia
             db.session.rollback()
             raise e
 
+
+@event.listens_for(About, 'after_insert')
+@event.listens_for(About, 'after_update')
+@event.listens_for(About, 'after_delete')
+def _about_changed(mapper, connection, target):
+    """Invalidate /api/about validators whenever a section is edited"""
+    bump_version_after_commit(object_session(target), 'about')
@@ -1,7 +1,19 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
-from src.models import db, User, Post, Vote, MonthlyWinner
+from src.models import db, User, Post, Vote, PostVoteTally, MonthlyWinner, Job
+from src.routes.posts import get_field_selection
+from src.utils.cache import bump_version, get_cache, make_cache_key
+from src.utils import leaderboard
+from src.utils.pagination import get_page_size, paginate_keyset
+from src.utils.worker import job_handler, enqueue_job
+from src.utils.export import export_response, get_export_format
+from src.utils.passwords import hash_passwords
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
+import csv
+import io
+import re
+import time
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -14,15 +26,103 @@ def admin_required(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+# Bulk moderation
+MAX_BULK_IDS = 5000
+
+def parse_bool(value, name):
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ('true', 'false'):
+        return str(value).lower() == 'true'
+    raise ValueError(f'{name} must be true or false')
+
+def parse_datetime(value, name):
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO date')
+
+def bulk_conditions(model, data, filters):
+    """Turn a bulk request's ``ids`` list or ``filter`` object into WHERE conditions.
+
+    ``filters`` maps each allowed filter name to a function building its
+    condition. Exactly one of ids or a non-empty filter is required, so a
+    missing selection can never match every row. Raises ValueError.
+    """
+    ids = data.get('ids')
+    criteria = data.get('filter')
+    if (ids is None) == (criteria is None):
+        raise ValueError('Provide either ids or filter')
+    
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(isinstance(item, int) for item in ids):
+            raise ValueError('ids must be a non-empty list of integers')
+        if len(ids) > MAX_BULK_IDS:
+            raise ValueError(f'At most {MAX_BULK_IDS} ids per request')
+        return [model.id.in_(ids)]
+    
+    if not isinstance(criteria, dict) or not criteria:
+        raise ValueError('filter must be a non-empty object')
+    unknown = set(criteria) - set(filters)
+    if unknown:
+        raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+    return [filters[name](value) for name, value in criteria.items()]
+
+POST_BULK_FILTERS = {
+    'post_type': lambda value: Post.post_type == value,
+    'grade_level': lambda value: Post.grade_level == value,
+    'author_id': lambda value: Post.author_id == int(value),
+    'is_published': lambda value: Post.is_published == parse_bool(value, 'is_published'),
+    'created_before': lambda value: Post.created_at < parse_datetime(value, 'created_before'),
+    'created_after': lambda value: Post.created_at >= parse_datetime(value, 'created_after')
+}
+
+USER_BULK_FILTERS = {
+    'role': lambda value: User.role == value,
+    'grade_level': lambda value: User.grade_level == value,
+    'is_active': lambda value: User.is_active == parse_bool(value, 'is_active')
+}
+
 @admin_bp.route('/users', methods=['GET'])
 @login_required
 @admin_required
 def get_all_users():
-    """Get all users (admin only)"""
+    """Get one page of the user directory (admin only).
+
+    Filters: role, grade_level, is_active (true/false) and q, a prefix
+    search on username, name and email. The filtered total is counted on
+    the first page only; later pages just follow next_cursor.
+    """
     try:
-        users = User.query.all()
+        is_active = request.args.get('is_active')
+        if is_active is not None:
+            if is_active.lower() not in ('true', 'false'):
+                return jsonify({'error': 'is_active must be true or false'}), 400
+            is_active = is_active.lower() == 'true'
+        
+        query = User.directory_query(
+            role=request.args.get('role'),
+            grade_level=request.args.get('grade_level'),
+            is_active=is_active,
+            search=request.args.get('q')
+        )
+        
+        cursor = request.args.get('cursor')
+        try:
+            users, next_cursor = paginate_keyset(
+                query, (User.id,),
+                cursor=cursor,
+                limit=get_page_size(request.args)
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        total = None
+        if not cursor:
+            total = len(users) if next_cursor is None else query.order_by(None).with_entities(db.func.count(User.id)).scalar()
+        
         users_data = [user.to_dict() for user in users]
-        return jsonify({'users': users_data}), 200
+        return jsonify({'users': users_data, 'next_cursor': next_cursor, 'total': total}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -63,6 +163,12 @@ def update_user(user_id):
             user.email = data['email']
         
         db.session.commit()
+        User.forget_identities()
+        
+        # Author names are shown in every feed and on winners
+        if 'first_name' in data or 'last_name' in data:
+            bump_version(*Post.feed_version_scopes(['all']), 'winners', 'about')
+            leaderboard.reset()
         
         return jsonify({
             'message': 'User updated successfully',
@@ -73,11 +179,81 @@ def update_user(user_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+# Posts and votes are removed this many rows per transaction, so no lock is held for long
+USER_DELETE_CHUNK_SIZE = 500
+
+@job_handler('delete_user')
+def delete_user_job(params, progress):
+    """Background job: delete or archive a user's posts and votes in chunks, then the user.
+
+    With ``transfer_to`` the posts (and their votes and wins) are handed to
+    that account; otherwise they are deleted. The user's own votes are
+    always removed and the tallies adjusted.
+    """
+    user_id = params['user_id']
+    transfer_to = params.get('transfer_to')
+    
+    total = (
+        db.session.query(db.func.count(Post.id)).filter(Post.author_id == user_id).scalar()
+        + db.session.query(db.func.count(Vote.id)).filter(Vote.user_id == user_id).scalar()
+    )
+    done = posts_done = votes_done = 0
+    
+    while True:
+        post_ids = [post_id for (post_id,) in db.session.query(Post.id).filter(
+            Post.author_id == user_id
+        ).limit(USER_DELETE_CHUNK_SIZE)]
+        if not post_ids:
+            break
+        if transfer_to:
+            db.session.execute(
+                db.update(Post).where(Post.id.in_(post_ids)).values(author_id=transfer_to)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            Post.delete_where([Post.id.in_(post_ids)])
+        db.session.commit()
+        posts_done += len(post_ids)
+        done += len(post_ids)
+        progress(done, total, f"{'Transferred' if transfer_to else 'Deleted'} {posts_done} posts")
+    
+    while True:
+        vote_ids = [vote_id for (vote_id,) in db.session.query(Vote.id).filter(
+            Vote.user_id == user_id
+        ).limit(USER_DELETE_CHUNK_SIZE)]
+        if not vote_ids:
+            break
+        Vote.delete_where([Vote.id.in_(vote_ids)])
+        db.session.commit()
+        votes_done += len(vote_ids)
+        done += len(vote_ids)
+        progress(done, total, f'Deleted {votes_done} votes')
+    
+    deleted = User.delete_where([User.id == user_id], transfer_to=transfer_to or params.get('requested_by'))
+    db.session.commit()
+    User.forget_identities()
+    
+    # The user's votes and authored posts disappear from every feed
+    bump_version(*Post.feed_version_scopes(['all']), 'winners', Vote.version_scope(user_id))
+    leaderboard.reset()
+    progress(total, total, 'Done')
+    
+    return {
+        'user_id': user_id,
+        'posts_transferred' if transfer_to else 'posts_deleted': posts_done,
+        'votes_deleted': votes_done,
+        'user_deleted': bool(deleted)
+    }
+
 @admin_bp.route('/users/<int:user_id>', methods=['DELETE'])
 @login_required
 @admin_required
 def delete_user(user_id):
-    """Delete user (admin only)"""
+    """Delete a user in the background (admin only); poll /jobs/<id> for progress.
+
+    ?transfer_to=<user id> archives the user's posts under that account
+    instead of deleting them. The user is deactivated at once.
+    """
     try:
         user = User.query.get_or_404(user_id)
         
@@ -85,10 +261,226 @@ def delete_user(user_id):
         if user.id == current_user.id:
             return jsonify({'error': 'Cannot delete your own account'}), 400
         
-        db.session.delete(user)
+        transfer_to = request.args.get('transfer_to', type=int)
+        if transfer_to is not None:
+            if transfer_to == user_id or db.session.get(User, transfer_to) is None:
+                return jsonify({'error': 'transfer_to must be another existing user'}), 400
+        
+        user.is_active = False
         db.session.commit()
+        User.forget_identities()
+        
+        job = enqueue_job('delete_user', {
+            'user_id': user_id,
+            'transfer_to': transfer_to,
+            'requested_by': current_user.id
+        }, created_by=current_user.id)
         
-        return jsonify({'message': 'User deleted successfully'}), 200
+        return jsonify({'message': 'User deletion started', 'job': job.to_dict()}), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/users/bulk', methods=['POST'])
+@login_required
+@admin_required
+def bulk_moderate_users():
+    """Activate, deactivate, regrade or delete many users in one transaction (admin only).
+
+    Body: {"action": ..., "ids": [...]} or {"action": ..., "filter": {...}},
+    plus "grade_level" for regrade. Your own account is never affected, and
+    delete skips users who still have posts.
+    """
+    try:
+        data = request.get_json() or {}
+        action = data.get('action')
+        if action not in ('activate', 'deactivate', 'regrade', 'delete'):
+            return jsonify({'error': 'action must be activate, deactivate, regrade or delete'}), 400
+        if action == 'regrade' and data.get('grade_level') not in USER_GRADES:
+            return jsonify({'error': 'Invalid grade level'}), 400
+        
+        try:
+            conditions = bulk_conditions(User, data, USER_BULK_FILTERS)
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
+        conditions.append(User.id != current_user.id)
+        
+        skipped = 0
+        if action == 'delete':
+            has_posts = db.exists().where(Post.author_id == User.id)
+            skipped = db.session.query(db.func.count(User.id)).filter(*conditions, has_posts).scalar()
+            conditions.append(~has_posts)
+            affected = User.delete_where(conditions, transfer_to=current_user.id)
+        else:
+            values = {
+                'activate': {'is_active': True},
+                'deactivate': {'is_active': False},
+                'regrade': {'grade_level': data.get('grade_level')}
+            }[action]
+            affected = db.session.execute(
+                db.update(User).where(*conditions).values(**values).execution_options(synchronize_session=False)
+            ).rowcount
+        
+        db.session.commit()
+        if affected:
+            User.forget_identities()
+        
+        if action == 'delete' and affected:
+            bump_version(*Post.feed_version_scopes(['all']), 'winners')
+            leaderboard.reset()
+        
+        return jsonify({
+            'message': f'{action} applied to {affected} users',
+            'action': action,
+            'affected': affected,
+            'skipped': skipped
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+# Bulk user import
+IMPORT_FIELDS = ['username', 'email', 'password', 'role', 'grade_level', 'first_name', 'last_name']
+USER_ROLES = ['admin', 'language_teacher', 'teacher', 'student', 'parent']
+USER_GRADES = ['junior', 'middle', 'senior']
+MAX_IMPORT_ROWS = 5000
+IMPORT_BATCH_SIZE = 500
+
+def read_import_rows():
+    """Read user rows from an uploaded CSV file, a text/csv body or a JSON list (bare or under "users")"""
+    upload = request.files.get('file')
+    if upload is not None or request.mimetype == 'text/csv':
+        text = upload.read().decode('utf-8-sig') if upload is not None else request.get_data(as_text=True)
+        return list(csv.DictReader(io.StringIO(text)))
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('users')
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise ValueError('Send a CSV file or a JSON list of users')
+    return data
+
+def find_existing(column, values):
+    """Get which of ``values`` are already taken in a unique user column, a few hundred per query"""
+    values = list(values)
+    taken = set()
+    for start in range(0, len(values), IMPORT_BATCH_SIZE):
+        chunk = values[start:start + IMPORT_BATCH_SIZE]
+        taken.update(value for (value,) in db.session.query(column).filter(column.in_(chunk)))
+    return taken
+
+def import_users(rows):
+    """Validate, hash and insert user rows; returns (created, errors, timings).
+
+    Conflicts are found with set-based queries before any hashing, so only
+    rows that can be inserted pay for it. Inserts go in batches of
+    IMPORT_BATCH_SIZE, one transaction each; a batch that still hits a
+    unique constraint (a concurrent signup) is retried row by row.
+    ``timings`` holds the seconds spent hashing and inserting.
+    """
+    errors = []
+    candidates = []
+    usernames, emails = set(), set()
+    for number, row in enumerate(rows, start=1):
+        row = {field: str(row.get(field) or '').strip() for field in IMPORT_FIELDS}
+        missing = [field for field in IMPORT_FIELDS if not row[field]]
+        if missing:
+            error = f"Missing {', '.join(missing)}"
+        elif row['role'] not in USER_ROLES:
+            error = 'Invalid role'
+        elif row['grade_level'] not in USER_GRADES:
+            error = 'Invalid grade level'
+        elif row['username'] in usernames:
+            error = 'Duplicate username in import'
+        elif row['email'] in emails:
+            error = 'Duplicate email in import'
+        else:
+            usernames.add(row['username'])
+            emails.add(row['email'])
+            candidates.append((number, row))
+            continue
+        errors.append({'row': number, 'username': row['username'] or None, 'error': error})
+    
+    taken_usernames = find_existing(User.username, usernames)
+    taken_emails = find_existing(User.email, emails)
+    valid = []
+    for number, row in candidates:
+        if row['username'] in taken_usernames:
+            errors.append({'row': number, 'username': row['username'], 'error': 'Username already exists'})
+        elif row['email'] in taken_emails:
+            errors.append({'row': number, 'username': row['username'], 'error': 'Email already exists'})
+        else:
+            valid.append((number, row))
+    
+    timings = {}
+    started = time.perf_counter()
+    hashes = hash_passwords(row['password'] for _, row in valid)
+    timings['hash_seconds'] = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    created = 0
+    for start in range(0, len(valid), IMPORT_BATCH_SIZE):
+        batch = []
+        for (number, row), password_hash in zip(valid[start:start + IMPORT_BATCH_SIZE], hashes[start:start + IMPORT_BATCH_SIZE]):
+            values = {field: row[field] for field in IMPORT_FIELDS if field != 'password'}
+            values.update(password_hash=password_hash, is_active=True, created_at=datetime.utcnow())
+            batch.append((number, values))
+        
+        try:
+            db.session.execute(db.insert(User), [values for _, values in batch])
+            db.session.commit()
+            created += len(batch)
+        except IntegrityError:
+            db.session.rollback()
+            for number, values in batch:
+                try:
+                    db.session.execute(db.insert(User), [values])
+                    db.session.commit()
+                    created += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    errors.append({'row': number, 'username': values['username'], 'error': 'Username or email already exists'})
+    timings['insert_seconds'] = time.perf_counter() - started
+    
+    errors.sort(key=lambda error: error['row'])
+    return created, errors, timings
+
+@admin_bp.route('/users/import', methods=['POST'])
+@login_required
+@admin_required
+def bulk_import_users():
+    """Create many users from CSV or JSON (admin only); reports per-row errors and throughput.
+
+    Columns: username, email, password, role, grade_level, first_name,
+    last_name. Valid rows are created even when others fail.
+    """
+    try:
+        started = time.perf_counter()
+        try:
+            rows = read_import_rows()
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if len(rows) > MAX_IMPORT_ROWS:
+            return jsonify({'error': f'At most {MAX_IMPORT_ROWS} users can be imported at once'}), 400
+        
+        created, errors, timings = import_users(rows)
+        
+        elapsed = time.perf_counter() - started
+        return jsonify({
+            'message': f'Imported {created} of {len(rows)} users',
+            'created': created,
+            'failed': len(errors),
+            'errors': errors,
+            'timing': {
+                'total_seconds': round(elapsed, 3),
+                'hash_seconds': round(timings['hash_seconds'], 3),
+                'insert_seconds': round(timings['insert_seconds'], 3),
+                'rows_per_second': round(len(rows) / elapsed, 1) if elapsed else None
+            }
+        }), 201 if created else 200
         
     except Exception as e:
         db.session.rollback()
@@ -100,9 +492,26 @@ def delete_user(user_id):
 def get_all_posts():
     """Get all posts including unpublished (admin only)"""
     try:
-        posts = Post.query.order_by(Post.created_at.desc()).all()
-        posts_data = [post.to_dict(include_votes=True) for post in posts]
-        return jsonify({'posts': posts_data}), 200
+        try:
+            fields, summary = get_field_selection(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        query = Post.query.options(db.joinedload(Post.author))
+        if summary:
+            query = query.options(*Post.summary_options())
+        
+        try:
+            posts, next_cursor = paginate_keyset(
+                query, (Post.created_at, Post.id),
+                cursor=request.args.get('cursor'),
+                limit=get_page_size(request.args)
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        posts_data = Post.to_dict_list(posts, summary=summary, fields=fields)
+        return jsonify({'posts': posts_data, 'next_cursor': next_cursor}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -114,6 +523,7 @@ def update_post(post_id):
     try:
         post = Post.query.get_or_404(post_id)
         data = request.get_json()
+        previous_grade_level = post.grade_level
         
         # Update allowed fields
         if 'title' in data:
@@ -141,6 +551,8 @@ def update_post(post_id):
         
         post.updated_at = datetime.utcnow()
         db.session.commit()
+        bump_version(*Post.feed_version_scopes([previous_grade_level, post.grade_level]), 'winners')
+        leaderboard.reset()
         
         return jsonify({
             'message': 'Post updated successfully',
@@ -158,8 +570,11 @@ def delete_post(post_id):
     """Delete post (admin only)"""
     try:
         post = Post.query.get_or_404(post_id)
+        grade_level = post.grade_level
         db.session.delete(post)
         db.session.commit()
+        bump_version(*Post.feed_version_scopes([grade_level]), 'winners')
+        leaderboard.reset()
         
         return jsonify({'message': 'Post deleted successfully'}), 200
         
@@ -167,63 +582,321 @@ def delete_post(post_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@admin_bp.route('/calculate-winners', methods=['POST'])
+@admin_bp.route('/posts/bulk', methods=['POST'])
 @login_required
 @admin_required
-def calculate_monthly_winners():
-    """Calculate monthly winners (admin only)"""
+def bulk_moderate_posts():
+    """Publish, unpublish, regrade, expire or delete many posts in one transaction (admin only).
+
+    Body: {"action": ..., "ids": [...]} or {"action": ..., "filter": {...}},
+    plus "grade_level" for regrade and an optional "expires_at" for expire
+    (default now).
+    """
     try:
-        data = request.get_json()
-        month = data.get('month', Vote.get_current_month())
+        data = request.get_json() or {}
+        action = data.get('action')
+        if action not in ('publish', 'unpublish', 'regrade', 'expire', 'delete'):
+            return jsonify({'error': 'action must be publish, unpublish, regrade, expire or delete'}), 400
+        if action == 'regrade' and data.get('grade_level') not in ['junior', 'middle', 'senior', 'all']:
+            return jsonify({'error': 'Invalid grade level'}), 400
+        
+        try:
+            conditions = bulk_conditions(Post, data, POST_BULK_FILTERS)
+            expires_at = datetime.utcnow()
+            if action == 'expire' and data.get('expires_at'):
+                expires_at = parse_datetime(data['expires_at'], 'expires_at')
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if action == 'delete':
+            affected = Post.delete_where(conditions)
+        else:
+            values = {
+                'publish': {'is_published': True},
+                'unpublish': {'is_published': False},
+                'regrade': {'grade_level': data.get('grade_level')},
+                'expire': {'expires_at': expires_at}
+            }[action]
+            affected = db.session.execute(
+                db.update(Post).where(*conditions).values(updated_at=datetime.utcnow(), **values)
+                .execution_options(synchronize_session=False)
+            ).rowcount
         
-        winners = MonthlyWinner.calculate_monthly_winners(month)
-        winners_data = [winner.to_dict() for winner in winners]
+        db.session.commit()
+        
+        if affected:
+            bump_version(*Post.feed_version_scopes(['all']), 'winners')
+            leaderboard.reset()
         
         return jsonify({
-            'message': f'Monthly winners calculated for {month}',
-            'winners': winners_data
+            'message': f'{action} applied to {affected} posts',
+            'action': action,
+            'affected': affected
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@admin_bp.route('/stats', methods=['GET'])
+@job_handler('calculate_winners')
+def calculate_winners_job(params, progress):
+    """Background job: calculate and store winners for a month range"""
+    start_month, end_month = params['start_month'], params['end_month']
+    progress(0, 1, f'Calculating winners for {start_month} to {end_month}')
+    winners = MonthlyWinner.calculate_winners_for_range(start_month, end_month, recompute=params.get('recompute', False))
+    bump_version('winners')
+    progress(1, 1)
+    return {'winners': [winner.to_dict() for winner in winners]}
+
+@admin_bp.route('/calculate-winners', methods=['POST'])
 @login_required
 @admin_required
-def get_stats():
-    """Get system statistics (admin only)"""
+def calculate_monthly_winners():
+    """Queue a monthly winner calculation (admin only); poll /jobs/<id> for the result"""
     try:
-        stats = {
-            'total_users': User.query.count(),
-            'active_users': User.query.filter_by(is_active=True).count(),
-            'total_posts': Post.query.count(),
-            'published_posts': Post.query.filter_by(is_published=True).count(),
-            'total_votes': Vote.query.count(),
-            'users_by_role': {},
-            'users_by_grade': {},
-            'posts_by_type': {},
-            'posts_by_grade': {}
-        }
+        data = request.get_json() or {}
+        month = data.get('month', Vote.get_current_month())
+        start_month = data.get('start_month', month)
+        end_month = data.get('end_month', start_month)
+        recompute = bool(data.get('recompute', False))
+        
+        try:
+            parse_month(start_month, 'start_month')
+            parse_month(end_month, 'end_month')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if start_month > end_month:
+            return jsonify({'error': 'start_month must not be after end_month'}), 400
+        
+        job = enqueue_job('calculate_winners', {
+            'start_month': start_month,
+            'end_month': end_month,
+            'recompute': recompute
+        }, created_by=current_user.id)
+        
+        period = start_month if start_month == end_month else f'{start_month} to {end_month}'
+        return jsonify({
+            'message': f'Monthly winner calculation queued for {period}',
+            'job': job.to_dict()
+        }), 202
         
-        # Users by role
-        for role in ['admin', 'language_teacher', 'teacher', 'student', 'parent']:
-            stats['users_by_role'][role] = User.query.filter_by(role=role).count()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/jobs', methods=['GET'])
+@login_required
+@admin_required
+def get_jobs():
+    """List background jobs, newest first, optionally filtered by status or kind (admin only)"""
+    try:
+        query = Job.query
+        if request.args.get('status'):
+            query = query.filter(Job.status == request.args['status'])
+        if request.args.get('kind'):
+            query = query.filter(Job.kind == request.args['kind'])
+        
+        try:
+            jobs, next_cursor = paginate_keyset(
+                query, (Job.id,),
+                cursor=request.args.get('cursor'),
+                limit=get_page_size(request.args)
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Users by grade
-        for grade in ['junior', 'middle', 'senior']:
-            stats['users_by_grade'][grade] = User.query.filter_by(grade_level=grade).count()
+        return jsonify({
+            'jobs': [job.to_dict() for job in jobs],
+            'next_cursor': next_cursor
+        }), 200
         
-        # Posts by type
-        for post_type in ['article', 'announcement', 'reminder', 'principal_note']:
-            stats['posts_by_type'][post_type] = Post.query.filter_by(post_type=post_type).count()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@login_required
+@admin_required
+def get_job(job_id):
+    """Get a background job's status, progress and result (admin only)"""
+    try:
+        job = Job.query.get_or_404(job_id)
+        return jsonify({'job': job.to_dict()}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def parse_month(value, name):
+    """Validate a YYYY-MM month; raises ValueError naming the parameter.
+
+    Months are compared and stored as strings, so the zero padding is
+    required: strptime alone would accept "2024-1", which sorts after
+    "2024-10".
+    """
+    if not isinstance(value, str) or not re.fullmatch(r'\d{4}-(0[1-9]|1[0-2])', value):
+        raise ValueError(f'{name} must be in YYYY-MM format')
+    return value
+
+@admin_bp.route('/export/posts', methods=['GET'])
+@login_required
+@admin_required
+def export_posts():
+    """Stream every post with its author and total votes as NDJSON or CSV (admin only)"""
+    try:
+        export_format = get_export_format(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        total_votes = db.select(db.func.coalesce(db.func.sum(PostVoteTally.count), 0)).where(
+            PostVoteTally.post_id == Post.id
+        ).scalar_subquery()
+        
+        columns = [
+            Post.id, Post.title, Post.post_type, Post.grade_level, Post.author_id,
+            (User.first_name + ' ' + User.last_name).label('author_name'),
+            Post.is_published, Post.created_at, Post.updated_at, Post.expires_at,
+            total_votes.label('total_votes')
+        ]
+        if request.args.get('include_content') == '1':
+            columns.append(Post.content)
+        
+        statement = db.select(*columns).join(User, Post.author_id == User.id)
+        if request.args.get('post_type'):
+            statement = statement.where(Post.post_type == request.args['post_type'])
+        if request.args.get('grade_level'):
+            statement = statement.where(Post.grade_level == request.args['grade_level'])
+        
+        return export_response(db.session, statement.order_by(Post.id), export_format, 'posts')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/export/votes', methods=['GET'])
+@login_required
+@admin_required
+def export_votes():
+    """Stream the raw votes cast in one month as NDJSON or CSV (admin only)"""
+    try:
+        export_format = get_export_format(request.args)
+        month = parse_month(request.args.get('month', Vote.get_current_month()), 'month')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        statement = db.select(
+            Vote.id, Vote.user_id, Vote.post_id, Vote.vote_month, Vote.created_at
+        ).where(Vote.vote_month == month).order_by(Vote.id)
         
-        # Posts by grade
-        for grade in ['junior', 'middle', 'senior', 'all']:
-            stats['posts_by_grade'][grade] = Post.query.filter_by(grade_level=grade).count()
+        return export_response(db.session, statement, export_format, f'votes-{month}')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/export/winners', methods=['GET'])
+@login_required
+@admin_required
+def export_winners():
+    """Stream monthly winners, optionally within start_month..end_month, as NDJSON or CSV (admin only)"""
+    try:
+        export_format = get_export_format(request.args)
+        start_month = request.args.get('start_month')
+        end_month = request.args.get('end_month')
+        if start_month:
+            parse_month(start_month, 'start_month')
+        if end_month:
+            parse_month(end_month, 'end_month')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        statement = db.select(
+            MonthlyWinner.month, MonthlyWinner.grade_level, MonthlyWinner.post_id,
+            Post.title.label('post_title'),
+            (User.first_name + ' ' + User.last_name).label('post_author'),
+            MonthlyWinner.vote_count, MonthlyWinner.created_at
+        ).join(Post, MonthlyWinner.post_id == Post.id).join(User, Post.author_id == User.id)
+        if start_month:
+            statement = statement.where(MonthlyWinner.month >= start_month)
+        if end_month:
+            statement = statement.where(MonthlyWinner.month <= end_month)
+        
+        statement = statement.order_by(MonthlyWinner.month, MonthlyWinner.grade_level)
+        return export_response(db.session, statement, export_format, 'winners')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# The stats snapshot is rebuilt at most this often unless ?refresh=1 is passed
+STATS_CACHE_TTL = 30
+
+def collect_stats():
+    """Count users, posts and votes with one UNION ALL of grouped aggregates.
+
+    A single statement reads from a single snapshot, so the numbers agree
+    with each other on any database. Votes are summed from post_vote_tally,
+    which has one row per post and month instead of one per vote.
+    """
+    def text_column(column):
+        return db.cast(column, db.String(20))
+    
+    no_text = db.cast(db.null(), db.String(20))
+    rows = db.session.execute(db.union_all(
+        db.select(
+            db.literal('user'), text_column(User.role), text_column(User.grade_level), User.is_active, db.func.count()
+        ).group_by(User.role, User.grade_level, User.is_active),
+        db.select(
+            db.literal('post'), text_column(Post.post_type), text_column(Post.grade_level), Post.is_published, db.func.count()
+        ).group_by(Post.post_type, Post.grade_level, Post.is_published),
+        db.select(
+            db.literal('vote'), no_text, no_text, db.null(), db.func.coalesce(db.func.sum(PostVoteTally.count), 0)
+        )
+    )).all()
+    
+    stats = {
+        'total_users': 0,
+        'active_users': 0,
+        'total_posts': 0,
+        'published_posts': 0,
+        'total_votes': 0,
+        'users_by_role': dict.fromkeys(['admin', 'language_teacher', 'teacher', 'student', 'parent'], 0),
+        'users_by_grade': dict.fromkeys(['junior', 'middle', 'senior'], 0),
+        'posts_by_type': dict.fromkeys(['article', 'announcement', 'reminder', 'principal_note'], 0),
+        'posts_by_grade': dict.fromkeys(['junior', 'middle', 'senior', 'all'], 0)
+    }
+    
+    for kind, kind_of, grade_level, flag, count in rows:
+        count = int(count or 0)
+        if kind == 'user':
+            stats['total_users'] += count
+            if flag:
+                stats['active_users'] += count
+            if kind_of in stats['users_by_role']:
+                stats['users_by_role'][kind_of] += count
+            if grade_level in stats['users_by_grade']:
+                stats['users_by_grade'][grade_level] += count
+        elif kind == 'post':
+            stats['total_posts'] += count
+            if flag:
+                stats['published_posts'] += count
+            if kind_of in stats['posts_by_type']:
+                stats['posts_by_type'][kind_of] += count
+            if grade_level in stats['posts_by_grade']:
+                stats['posts_by_grade'][grade_level] += count
+        else:
+            stats['total_votes'] = count
+    
+    return stats
+
+@admin_bp.route('/stats', methods=['GET'])
+@login_required
+@admin_required
+def get_stats():
+    """Get system statistics (admin only); ?refresh=1 skips the cached snapshot"""
+    try:
+        key = make_cache_key('admin_stats')
+        snapshot = None if request.args.get('refresh') == '1' else get_cache().get(key)
+        if snapshot is None:
+            snapshot = {'stats': collect_stats(), 'generated_at': datetime.utcnow().isoformat()}
+            get_cache().set(key, snapshot, ttl=STATS_CACHE_TTL)
         
-        return jsonify({'stats': stats}), 200
+        return jsonify(snapshot), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-
@@ -1,10 +1,16 @@
 from flask import Blueprint, request, jsonify, session
 from flask_login import login_user, logout_user, login_required, current_user
 from src.models import db, User
-from werkzeug.security import check_password_hash
+from src.utils.passwords import PasswordBusy
 
 auth_bp = Blueprint('auth', __name__)
 
+def password_busy_response():
+    """Turn a request away quickly while the password executor is saturated"""
+    response = jsonify({'error': 'The server is busy, please try again in a moment'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user"""
@@ -43,7 +49,10 @@ def register():
             first_name=data['first_name'],
             last_name=data['last_name']
         )
-        user.set_password(data['password'])
+        try:
+            user.set_password(data['password'])
+        except PasswordBusy:
+            return password_busy_response()
         
         db.session.add(user)
         db.session.commit()
@@ -68,7 +77,20 @@ def login():
         
         user = User.query.filter_by(username=data['username']).first()
         
-        if user and user.check_password(data['password']) and user.is_active:
+        try:
+            valid = user is not None and user.check_password(data['password'])
+        except PasswordBusy:
+            return password_busy_response()
+        
+        if valid and user.is_active:
+            # Upgrade hashes made with outdated parameters while the password is at hand
+            if user.password_needs_rehash():
+                try:
+                    user.set_password(data['password'])
+                    db.session.commit()
+                except PasswordBusy:
+                    pass  # a later login will upgrade it
+            
             login_user(user, remember=data.get('remember', False))
             return jsonify({
                 'message': 'Login successful',
@@ -0,0 +1,203 @@
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import timezone
+from flask import request, make_response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class CacheBackend(ABC):
+    """Storage interface for the response cache and version counters.
+
+    The default InMemoryCache serves a single process. A shared store such
+    as Redis can implement the same operations (GET, SETEX, DEL, INCR) so
+    every worker sees the same entries and counters; cached values are plain
+    dicts and lists and can be pickled.
+    """
+
+    # True when every process sees the same counters. Version counters live
+    # in the backend then, and in the cache_version table otherwise.
+    shared = False
+
+    # Mixed into every ETag; change it if version counters can be reset
+    token = ''
+
+    @abstractmethod
+    def get(self, key):
+        """Get a value, or None when missing or expired"""
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        """Store a value for ``ttl`` seconds (None for the default TTL, 0 to keep until evicted)"""
+
+    @abstractmethod
+    def delete(self, key):
+        """Remove a value if present"""
+
+    @abstractmethod
+    def incr(self, key):
+        """Atomically increment a counter that is never evicted; returns the new value"""
+
+    @abstractmethod
+    def get_counter(self, key):
+        """Get a counter's current value (0 when unset)"""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every value (counters are kept)"""
+
+
+class InMemoryCache(CacheBackend):
+    """Per-process cache with LRU eviction and per-entry TTL"""
+
+    def __init__(self, max_entries=1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = InMemoryCache()
+
+
+def configure_cache(backend):
+    """Replace the process-wide cache backend, e.g. with a shared store"""
+    global _cache
+    _cache = backend
+
+
+def get_cache():
+    """Get the process-wide cache backend"""
+    return _cache
+
+
+# Version counters are bumped by write paths after they commit. Cache keys
+# and ETags embed the versions they were built from, so a bump invalidates
+# every dependent entry at once and stale ones age out through LRU/TTL.
+# Counters must be seen by every process, or a write handled by one worker
+# would leave the others answering 304 for stale data: unless the backend is
+# shared they are kept in the database.
+def get_versions(*scopes):
+    """Get the current version of each scope, in order"""
+    if _cache.shared:
+        return tuple(_cache.get_counter(f'version:{scope}') for scope in scopes)
+    from src.models.cache_version import CacheVersion
+    return CacheVersion.get_versions(scopes)
+
+
+def bump_version(*scopes):
+    """Mark data under each scope as changed"""
+    if not scopes:
+        return
+    if _cache.shared:
+        for scope in scopes:
+            _cache.incr(f'version:{scope}')
+        return
+    from src.models.cache_version import CacheVersion
+    CacheVersion.bump(scopes)
+
+
+def make_cache_key(*parts):
+    """Hash the parts a cached value depends on into a short key"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def bump_version_after_commit(session, *scopes):
+    """Bump scopes once ``session`` commits, for changes made inside a flush"""
+    session.info.setdefault('pending_version_bumps', set()).update(scopes)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending_version_bumps(session):
+    bump_version(*session.info.pop('pending_version_bumps', ()))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_version_bumps(session):
+    session.info.pop('pending_version_bumps', None)
+
+
+def make_etag(*parts):
+    """Hash the parts a response depends on into an ETag digest"""
+    return hashlib.sha1(repr((_cache.token,) + parts).encode()).hexdigest()[:24]
+
+
+def match_etag(digest):
+    """Return the If-None-Match tag that still validates ``digest``, if any.
+
+    Tags are ``<digest>.<deadline>``: the deadline is the unix time at which
+    the response goes stale on its own (an announcement expiring) or 0.
+    """
+    now = time.time()
+    for tag in request.if_none_match.as_set(include_weak=True):
+        tag_digest, _, deadline = tag.partition('.')
+        if tag_digest != digest:
+            continue
+        try:
+            if not int(deadline) or now < int(deadline):
+                return tag
+        except ValueError:
+            continue
+    return None
+
+
+def not_modified(tag):
+    """Build an empty 304 response echoing the matched tag"""
+    response = make_response('', 304)
+    response.set_etag(tag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def with_etag(response, digest, stale_at=None):
+    """Attach an ETag (and revalidation policy) to a response.
+
+    ``stale_at`` is a naive UTC datetime after which the content changes
+    without a write, such as the earliest expiry among the posts returned.
+    """
+    deadline = int(stale_at.replace(tzinfo=timezone.utc).timestamp()) if stale_at else 0
+    response.set_etag(f'{digest}.{deadline}')
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
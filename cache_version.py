@@ -0,0 +1,44 @@
+from src.models.user import db
+from src.utils.sql import conflict_insert
+
+class CacheVersion(db.Model):
+    """Version counter of a cache scope, seen by every process sharing the database"""
+    __tablename__ = 'cache_version'
+
+    scope = db.Column(db.String(64), primary_key=True)  # e.g. 'posts:junior', 'winners', 'about'
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def get_versions(scopes):
+        """Get the version of each scope, in order, with one primary-key lookup (0 when never bumped)"""
+        versions = dict(db.session.execute(
+            db.select(CacheVersion.scope, CacheVersion.version).where(CacheVersion.scope.in_(scopes))
+        ).all())
+        return tuple(versions.get(scope, 0) for scope in scopes)
+
+    @staticmethod
+    def bump(scopes):
+        """Increment the versions of scopes in a short transaction of their own.
+
+        Write paths call this right after they commit, so it must not touch
+        the caller's session. Scopes are locked in sorted order, so concurrent
+        bumps cannot deadlock.
+        """
+        scopes = sorted(set(scopes))
+        insert = conflict_insert(db.session, CacheVersion)
+        with db.engine.begin() as connection:
+            if insert is not None:
+                connection.execute(
+                    insert.values([{'scope': scope, 'version': 1} for scope in scopes]).on_conflict_do_update(
+                        index_elements=['scope'],
+                        set_={'version': CacheVersion.version + 1}
+                    )
+                )
+                return
+            for scope in scopes:
+                updated = connection.execute(
+                    db.update(CacheVersion).where(CacheVersion.scope == scope)
+                    .values(version=CacheVersion.version + 1)
+                ).rowcount
+                if not updated:
+                    connection.execute(db.insert(CacheVersion).values(scope=scope, version=1))
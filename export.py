@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from flask import Response, stream_with_context
+
+# Rows fetched from the database cursor at a time, and written per chunk
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def get_export_format(args):
+    """Read ?format= (ndjson by default); raises ValueError for anything else"""
+    export_format = args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return export_format
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_chunk(columns, rows):
+    return ''.join(
+        json.dumps({column: _plain(value) for column, value in zip(columns, row)}) + '\n'
+        for row in rows
+    )
+
+
+def _csv_chunk(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def export_response(session, statement, export_format, filename):
+    """Stream the rows of a select as NDJSON or CSV.
+
+    The query runs inside the generator with ``yield_per``, so rows come
+    off a server-side cursor one batch at a time and are written out as
+    they arrive: memory stays flat however many rows there are. Output keys
+    and CSV headers are the statement's column labels.
+    """
+    columns = list(statement.selected_columns.keys())
+
+    def generate():
+        if export_format == 'csv':
+            yield _csv_chunk([columns])
+        result = session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            yield _csv_chunk(rows) if export_format == 'csv' else _ndjson_chunk(columns, rows)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}.{export_format}',
+            'X-Accel-Buffering': 'no'
+        }
+    )
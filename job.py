@@ -0,0 +1,132 @@
+from src.models.user import db
+from datetime import datetime, timedelta
+import json
+
+class Job(db.Model):
+    """A queued admin task, run by a worker thread or a separate worker process"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # name of a registered job handler
+    status = db.Column(db.String(20), nullable=False, default=QUEUED)
+    params = db.Column(db.Text, nullable=False, default='{}')  # JSON
+    result = db.Column(db.Text)  # JSON, set on success
+    error = db.Column(db.Text)
+    progress_current = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer)
+    progress_message = db.Column(db.String(200))
+    worker = db.Column(db.String(100))  # who claimed the job
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (db.Index('ix_job_status_created_at', 'status', 'created_at'),)
+
+    @staticmethod
+    def enqueue(kind, params=None, created_by=None):
+        """Add a job to the queue and commit it so any worker can see it"""
+        job = Job(kind=kind, params=json.dumps(params or {}), created_by=created_by)
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    @staticmethod
+    def claim(job_id, worker):
+        """Mark a queued job as running; True only for the one worker whose update wins"""
+        now = datetime.utcnow()
+        result = db.session.execute(
+            db.update(Job).where(Job.id == job_id, Job.status == Job.QUEUED).values(
+                status=Job.RUNNING, worker=worker, started_at=now, updated_at=now
+            )
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    def claim_next(worker):
+        """Claim the oldest queued job, or return None when the queue is empty"""
+        while True:
+            job_id = db.session.query(Job.id).filter_by(status=Job.QUEUED).order_by(
+                Job.created_at, Job.id
+            ).limit(1).scalar()
+            if job_id is None:
+                db.session.rollback()
+                return None
+            # Another worker may have claimed it first; try the next one
+            if Job.claim(job_id, worker):
+                return db.session.get(Job, job_id)
+
+    @staticmethod
+    def requeue_stale(older_than):
+        """Put running jobs back in the queue when their worker has gone quiet.
+
+        Workers refresh ``updated_at`` whenever they report progress, so a job
+        untouched for ``older_than`` seconds most likely lost its process.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=older_than)
+        result = db.session.execute(
+            db.update(Job).where(Job.status == Job.RUNNING, Job.updated_at < cutoff).values(
+                status=Job.QUEUED, worker=None, started_at=None
+            )
+        )
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def report_progress(job_id, current, total=None, message=None):
+        """Record a running job's progress. Commits the session, so call it between batches"""
+        values = {'progress_current': current, 'updated_at': datetime.utcnow()}
+        if total is not None:
+            values['progress_total'] = total
+        if message is not None:
+            values['progress_message'] = message[:200]
+        db.session.execute(db.update(Job).where(Job.id == job_id).values(**values))
+        db.session.commit()
+
+    @staticmethod
+    def finish(job_id, result=None):
+        now = datetime.utcnow()
+        db.session.execute(db.update(Job).where(Job.id == job_id).values(
+            status=Job.SUCCEEDED, result=json.dumps(result), updated_at=now, finished_at=now
+        ))
+        db.session.commit()
+
+    @staticmethod
+    def fail(job_id, error):
+        now = datetime.utcnow()
+        db.session.execute(db.update(Job).where(Job.id == job_id).values(
+            status=Job.FAILED, error=str(error), updated_at=now, finished_at=now
+        ))
+        db.session.commit()
+
+    def get_params(self):
+        return json.loads(self.params or '{}')
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'params': self.get_params(),
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'progress': {
+                'current': self.progress_current,
+                'total': self.progress_total,
+                'message': self.progress_message
+            },
+            'worker': self.worker,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
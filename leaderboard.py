@@ -0,0 +1,136 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+
+# Boards are rebuilt from post_vote_tally after this many seconds, and cached
+# article metadata dropped with them. This bounds drift from votes and post
+# edits handled by other processes.
+SEED_TTL = 60
+
+# Article metadata is dropped wholesale beyond this many entries
+MAX_CACHED_ARTICLES = 1000
+
+
+class Leaderboard:
+    """Vote counts of one month's articles in one grade, kept sorted for top-k reads"""
+
+    __slots__ = ('counts', 'ranking')
+
+    def __init__(self):
+        self.counts = {}
+        # (-count, post_id) pairs: highest count first, ties by oldest post
+        self.ranking = []
+
+    def set_count(self, post_id, count):
+        """Move a post to its new count in O(log n) search plus a list shift.
+
+        Counts only grow between seeds, and concurrent votes can commit and
+        report their counts out of order, so a count no higher than the one
+        held is stale and ignored.
+        """
+        previous = self.counts.get(post_id)
+        if previous is not None and count <= previous:
+            return
+        if previous is not None:
+            del self.ranking[bisect_left(self.ranking, (-previous, post_id))]
+        self.counts[post_id] = count
+        insort(self.ranking, (-count, post_id))
+
+    def top(self, k):
+        """Get the k highest (post_id, count) pairs in O(k)"""
+        return [(post_id, -negative_count) for negative_count, post_id in self.ranking[:k]]
+
+
+_lock = threading.Lock()
+_boards = {}      # (month, grade_level) -> Leaderboard
+_seeded_at = {}   # month -> time.monotonic() of the last seed
+_articles = {}    # (post_id, summary) -> serialized post without vote fields
+_published = {}   # (month, grade_level) -> post ids of the top articles last published
+
+
+def _ensure_seeded(month):
+    """Load every board for ``month`` from the tallies with one grouped query"""
+    seeded_at = _seeded_at.get(month)
+    if seeded_at is not None and time.monotonic() - seeded_at < SEED_TTL:
+        return
+
+    from src.models.vote import Vote
+
+    boards = {}
+    for article in Vote.get_monthly_vote_counts(month):
+        board = boards.setdefault((month, article.grade_level), Leaderboard())
+        board.counts[article.id] = article.vote_count
+        board.ranking.append((-article.vote_count, article.id))
+    for board in boards.values():
+        board.ranking.sort()
+
+    # Only the current month is ever ranked, so older boards are dropped
+    _boards.clear()
+    _boards.update(boards)
+    _seeded_at.clear()
+    _seeded_at[month] = time.monotonic()
+    _articles.clear()
+
+
+def get_top_articles(month, grade_levels, k=10):
+    """Get the k highest (post_id, count) pairs across the given grades"""
+    with _lock:
+        _ensure_seeded(month)
+        rankings = [_boards[(month, grade)].top(k) for grade in grade_levels if (month, grade) in _boards]
+    merged = heapq.merge(*rankings, key=lambda entry: (-entry[1], entry[0]))
+    return list(merged)[:k]
+
+
+def record_vote(month, grade_level, post_id, count):
+    """Apply a committed vote's new monthly count to an already seeded board"""
+    with _lock:
+        if month in _seeded_at:
+            _boards.setdefault((month, grade_level), Leaderboard()).set_count(post_id, count)
+
+
+def take_top_change(month, grade_level, k=10):
+    """Get a grade's k highest (post_id, count) pairs if their order changed since the last call, else None.
+
+    Count changes within an unchanged order return None; live streams carry
+    those as per-post counts.
+    """
+    top_articles = get_top_articles(month, [grade_level], k)
+    post_ids = tuple(post_id for post_id, _ in top_articles)
+    with _lock:
+        if _published.get((month, grade_level)) == post_ids:
+            return None
+        _published[(month, grade_level)] = post_ids
+    return top_articles
+
+
+def get_articles(post_ids, summary=False):
+    """Get serialized posts by id, loading the ones not cached yet in one query"""
+    from src.models.user import db
+    from src.models.post import Post
+
+    with _lock:
+        articles = {post_id: _articles[(post_id, summary)] for post_id in post_ids if (post_id, summary) in _articles}
+
+    missing = [post_id for post_id in post_ids if post_id not in articles]
+    if missing:
+        query = Post.query.options(db.joinedload(Post.author)).filter(Post.id.in_(missing))
+        if summary:
+            query = query.options(*Post.summary_options())
+        loaded = {post.id: post.to_dict(summary=summary) for post in query}
+        with _lock:
+            if len(_articles) + len(loaded) > MAX_CACHED_ARTICLES:
+                _articles.clear()
+            for post_id, post_dict in loaded.items():
+                _articles[(post_id, summary)] = post_dict
+        articles.update(loaded)
+
+    return articles
+
+
+def reset():
+    """Forget every board and cached article, e.g. after a post is edited or deleted"""
+    with _lock:
+        _boards.clear()
+        _seeded_at.clear()
+        _articles.clear()
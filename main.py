@@ -3,15 +3,23 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+import click
 from flask import Flask, send_from_directory
 from flask_login import LoginManager
 from flask_cors import CORS
-from src.models import db, User, Post, Vote, MonthlyWinner, About
+from src.models import db, User, Post, Vote, PostVoteTally, MonthlyWinner, About
+from src.models.post import post_search_index
 from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.posts import posts_bp
 from src.routes.admin import admin_bp
 from src.routes.about import about_bp
+from src.routes.stream import stream_bp
+from src.utils.worker import DEFAULT_JOB_MODE, run_worker
+from src.utils.search import rebuild_search_index
+from src.utils.render import rerender_rows
+from src.utils.cache import bump_version
+from src.utils.schema import upgrade_schema
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'school_forum_secret_key_2024')
@@ -27,7 +35,9 @@ login_manager.login_message = 'Please log in to access this page.'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    identity = User.get_identity(int(user_id))
+    # A deactivated account loses its session on the next request
+    return identity if identity and identity.is_active else None
 
 # Register blueprints
 app.register_blueprint(user_bp, url_prefix='/api')
@@ -35,22 +45,79 @@ app.register_blueprint(auth_bp, url_prefix='/api')
 app.register_blueprint(posts_bp, url_prefix='/api')
 app.register_blueprint(admin_bp, url_prefix='/api')
 app.register_blueprint(about_bp, url_prefix='/api')
+app.register_blueprint(stream_bp, url_prefix='/api')
 
 # Database configuration
 # Database configuration - Use environment variable for production database
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
-        'DATABASE_URL',
-        f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}" # Fallback for local dev
-    )
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    db.init_app(app)
-
-    # IMPORTANT: Remove or guard db.create_all() and initial data population
-    # This should be done as a separate migration step, not on every app start.
-    # For local development, you might keep it, but for Netlify, it's problematic.
-    # with app.app_context():
-    #     db.create_all()
-    #     # ... (remove or guard initial user/post creation)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URL',
+    f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}" # Fallback for local dev
+)
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+db.init_app(app)
+
+# Background jobs run in this process ('thread') or only in `flask run-worker`
+# ('external', the default on serverless hosts such as Netlify functions)
+app.config['JOB_MODE'] = os.environ.get('JOB_MODE', DEFAULT_JOB_MODE)
+
+# IMPORTANT: Remove or guard db.create_all() and initial data population
+# This should be done as a separate migration step, not on every app start.
+# For local development, you might keep it, but for Netlify, it's problematic.
+# Run `flask upgrade-db` before deploying a release that adds tables or
+# columns: requests fail until the schema matches the models.
+# with app.app_context():
+#     db.create_all()
+#     # ... (remove or guard initial user/post creation)
+
+@app.cli.command('upgrade-db')
+def upgrade_db():
+    """Create missing tables, columns and indexes, then backfill the derived data."""
+    for change in upgrade_schema(db.engine, db.metadata, skip_indexes=[post_search_index]):
+        click.echo(change)
+    drift = PostVoteTally.reconcile()
+    click.echo(f'{len(drift)} vote tallies backfilled.')
+    rebuild_search_index(db.session, post_search_index)
+    click.echo('Search index rebuilt.')
+    for model in (Post, About):
+        updated = rerender_rows(db.session, model)
+        click.echo(f'{model.__tablename__}: {updated} rows rendered.')
+    bump_version(*Post.feed_version_scopes(['all']), 'about')
+    click.echo('Database is up to date.')
+
+@app.cli.command('reconcile-vote-tallies')
+@click.option('--dry-run', is_flag=True, help='Report drift without correcting it.')
+def reconcile_vote_tallies(dry_run):
+    """Rebuild post_vote_tally from the vote table and report drift."""
+    drift = PostVoteTally.reconcile(apply=not dry_run)
+    for entry in drift:
+        click.echo(f"post {entry['post_id']} {entry['month']}: recorded {entry['recorded']}, actual {entry['actual']}")
+    action = 'found' if dry_run else 'corrected'
+    click.echo(f'{len(drift)} drifted tallies {action}.')
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Create the post search index if missing and rebuild it from the post table."""
+    rebuild_search_index(db.session, post_search_index)
+    click.echo('Search index rebuilt.')
+
+@app.cli.command('rerender-content')
+@click.option('--batch-size', default=500, show_default=True, help='Rows read and written per batch.')
+def rerender_content(batch_size):
+    """Re-render stored post and about HTML and excerpts, e.g. after the renderer changes."""
+    for model in (Post, About):
+        updated = rerender_rows(db.session, model, batch_size)
+        click.echo(f'{model.__tablename__}: {updated} rows re-rendered.')
+    # Cached feeds and the about page embed the rendered HTML. The versions are
+    # shared, so this reaches running web processes too; their top-articles
+    # metadata refreshes when the leaderboards next reseed (within a minute).
+    bump_version(*Post.feed_version_scopes(['all']), 'about')
+
+@app.cli.command('run-worker')
+@click.option('--poll-interval', default=2.0, show_default=True, help='Seconds to wait when the queue is empty.')
+@click.option('--once', is_flag=True, help='Exit once the queue is empty.')
+def run_worker_command(poll_interval, once):
+    """Run queued background jobs (winner calculation, bulk admin tasks)."""
+    run_worker(poll_interval=poll_interval, once=once)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
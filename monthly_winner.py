@@ -1,4 +1,5 @@
 from src.models.user import db
+from src.utils.sql import conflict_insert
 from datetime import datetime
 
 class MonthlyWinner(db.Model):
@@ -10,55 +11,112 @@ class MonthlyWinner(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Ensure one winner per grade level per month
-    __table_args__ = (db.UniqueConstraint('month', 'grade_level', name='unique_month_grade_winner'),)
+    __table_args__ = (
+        db.UniqueConstraint('month', 'grade_level', name='unique_month_grade_winner'),
+        db.Index('ix_monthly_winner_grade_month', 'grade_level', 'month'),
+    )
+
+    @staticmethod
+    def with_post():
+        """Loader options that fetch each winner's post title and author in the same statement"""
+        from src.models.post import Post
+        from src.models.user import User
+        
+        return (
+            db.joinedload(MonthlyWinner.post).load_only(Post.title, Post.author_id)
+            .joinedload(Post.author).load_only(User.first_name, User.last_name),
+        )
 
     @staticmethod
     def calculate_monthly_winners(month):
         """Calculate and store winners for a specific month"""
-        from src.models.vote import Vote
+        return MonthlyWinner.calculate_winners_for_range(month, month)
+
+    @staticmethod
+    def calculate_winners_for_range(start_month, end_month, recompute=False):
+        """Calculate and store winners for every month from start_month to end_month.
+
+        One ranked query finds the top article of each (month, grade) pair;
+        ties go to the earlier post. Missing winners are inserted in bulk and,
+        with ``recompute``, existing ones that no longer match are
+        overwritten. Returns the winners that were created or changed.
+        """
+        from src.models.post_vote_tally import PostVoteTally
         from src.models.post import Post
         
-        grade_levels = ['junior', 'middle', 'senior']
-        winners = []
+        ranked = db.session.query(
+            PostVoteTally.month.label('month'),
+            Post.grade_level.label('grade_level'),
+            Post.id.label('post_id'),
+            PostVoteTally.count.label('vote_count'),
+            db.func.row_number().over(
+                partition_by=(PostVoteTally.month, Post.grade_level),
+                order_by=(PostVoteTally.count.desc(), Post.created_at.asc(), Post.id.asc())
+            ).label('position')
+        ).join(PostVoteTally, Post.id == PostVoteTally.post_id).filter(
+            PostVoteTally.month.between(start_month, end_month),
+            PostVoteTally.count > 0,
+            Post.post_type == 'article',
+            Post.is_published == True,
+            Post.grade_level.in_(['junior', 'middle', 'senior'])
+        ).subquery()
         
-        for grade_level in grade_levels:
-            # Get the top voted article for this grade level and month
-            top_article = db.session.query(
-                Post.id,
-                db.func.count(Vote.id).label('vote_count')
-            ).join(Vote, Post.id == Vote.post_id).filter(
-                Vote.vote_month == month,
-                Post.post_type == 'article',
-                Post.is_published == True,
-                Post.grade_level == grade_level
-            ).group_by(Post.id).order_by(db.desc('vote_count')).first()
-            
-            if top_article and top_article.vote_count > 0:
-                # Check if winner already exists for this month and grade
-                existing_winner = MonthlyWinner.query.filter_by(
-                    month=month,
-                    grade_level=grade_level
-                ).first()
-                
-                if not existing_winner:
-                    winner = MonthlyWinner(
-                        post_id=top_article.id,
-                        month=month,
-                        grade_level=grade_level,
-                        vote_count=top_article.vote_count
-                    )
-                    db.session.add(winner)
-                    winners.append(winner)
+        top_articles = db.session.query(ranked).filter(ranked.c.position == 1).all()
+        
+        existing = {
+            (winner.month, winner.grade_level): winner
+            for winner in MonthlyWinner.query.filter(MonthlyWinner.month.between(start_month, end_month))
+        }
         
-        if winners:
-            db.session.commit()
+        rows = []
+        for article in top_articles:
+            winner = existing.get((article.month, article.grade_level))
+            if winner is None or (recompute and (winner.post_id, winner.vote_count) != (article.post_id, article.vote_count)):
+                rows.append({
+                    'post_id': article.post_id,
+                    'month': article.month,
+                    'grade_level': article.grade_level,
+                    'vote_count': article.vote_count
+                })
         
-        return winners
+        if not rows:
+            return []
+        
+        MonthlyWinner.upsert_winners(rows)
+        db.session.commit()
+        
+        changed = {(row['month'], row['grade_level']) for row in rows}
+        winners = MonthlyWinner.query.options(*MonthlyWinner.with_post()).filter(
+            MonthlyWinner.month.between(start_month, end_month)
+        ).all()
+        return [winner for winner in winners if (winner.month, winner.grade_level) in changed]
+
+    @staticmethod
+    def upsert_winners(rows, batch_size=500):
+        """Insert winner rows, replacing any existing winner for the same month and grade"""
+        insert = conflict_insert(db.session, MonthlyWinner)
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            if insert is not None:
+                statement = insert.values(batch)
+                db.session.execute(statement.on_conflict_do_update(
+                    index_elements=['month', 'grade_level'],
+                    set_={'post_id': statement.excluded.post_id, 'vote_count': statement.excluded.vote_count}
+                ))
+                continue
+            
+            for row in batch:
+                winner = MonthlyWinner.query.filter_by(month=row['month'], grade_level=row['grade_level']).first()
+                if winner is None:
+                    db.session.add(MonthlyWinner(**row))
+                else:
+                    winner.post_id = row['post_id']
+                    winner.vote_count = row['vote_count']
 
     @staticmethod
     def get_winners_for_month(month, grade_level=None):
         """Get winners for a specific month, optionally filtered by grade level"""
-        query = MonthlyWinner.query.filter_by(month=month)
+        query = MonthlyWinner.query.options(*MonthlyWinner.with_post()).filter_by(month=month)
         
         if grade_level:
             query = query.filter_by(grade_level=grade_level)
@@ -68,13 +126,28 @@ class MonthlyWinner(db.Model):
     @staticmethod
     def get_recent_winners(limit=5, grade_level=None):
         """Get recent winners, optionally filtered by grade level"""
-        query = MonthlyWinner.query.order_by(MonthlyWinner.month.desc())
+        query = MonthlyWinner.query.options(*MonthlyWinner.with_post()).order_by(
+            MonthlyWinner.month.desc(), MonthlyWinner.grade_level
+        )
         
         if grade_level:
             query = query.filter_by(grade_level=grade_level)
         
         return query.limit(limit).all()
 
+    @staticmethod
+    def get_winners_history(grade_levels, before_month, year=None):
+        """Get every winner in the given grades from months before ``before_month``, newest first"""
+        query = MonthlyWinner.query.options(*MonthlyWinner.with_post()).filter(
+            MonthlyWinner.grade_level.in_(grade_levels),
+            MonthlyWinner.month < before_month
+        )
+        
+        if year:
+            query = query.filter(MonthlyWinner.month.between(f'{year}-01', f'{year}-12'))
+        
+        return query.order_by(MonthlyWinner.month.desc(), MonthlyWinner.grade_level).all()
+
     def __repr__(self):
         return f'<MonthlyWinner post_id={self.post_id} month={self.month} grade={self.grade_level}>'
 
@@ -0,0 +1,56 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def get_page_size(args, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Read the ``limit`` request argument, clamped to 1..maximum"""
+    limit = args.get('limit', default, type=int)
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(*values):
+    """Encode key values of the last row on a page into an opaque cursor"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, types):
+    """Decode a cursor back into key values, converting each with ``types``"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(value) if value_type is datetime else value_type(value)
+            for value, value_type in zip(values, types)
+        )
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def paginate_keyset(query, columns, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return one page of ``query`` in descending ``columns`` order and the next cursor.
+
+    The page starts strictly after the row the cursor was taken from, so the
+    database seeks straight to it through an index on ``columns`` instead of
+    skipping rows the way OFFSET does. Raises ValueError for a bad cursor.
+    """
+    if cursor:
+        values = decode_cursor(cursor, [column.type.python_type for column in columns])
+        query = query.filter(tuple_(*columns) < values)
+
+    items = query.order_by(*[column.desc() for column in columns]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(*[getattr(items[-1], column.key) for column in columns])
+
+    return items, next_cursor
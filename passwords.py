@@ -0,0 +1,95 @@
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+logger = logging.getLogger(__name__)
+
+# werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:1000000";
+# unset means werkzeug's default. Existing hashes with other parameters are
+# upgraded on the user's next successful login.
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or None
+
+# Hashing is CPU bound (~100ms per password), so bulk work is spread over processes
+HASH_PROCESSES = int(os.environ.get('HASH_PROCESSES', os.cpu_count() or 1))
+
+# Logins and registrations hash on a few dedicated threads (hashlib releases
+# the GIL), with at most PASSWORD_QUEUE_LIMIT more waiting; beyond that
+# requests are turned away instead of tying up web workers
+PASSWORD_THREADS = int(os.environ.get('PASSWORD_THREADS', os.cpu_count() or 1))
+PASSWORD_QUEUE_LIMIT = int(os.environ.get('PASSWORD_QUEUE_LIMIT', 32))
+
+
+class PasswordBusy(Exception):
+    """Raised when the password executor already has its maximum number of pending calls"""
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+_thread_pool = ThreadPoolExecutor(max_workers=PASSWORD_THREADS, thread_name_prefix='password')
+_thread_slots = threading.BoundedSemaphore(PASSWORD_THREADS + PASSWORD_QUEUE_LIMIT)
+_method_prefix = None
+
+
+def hash_password(password):
+    """Hash a password with the configured method, on the calling thread"""
+    if PASSWORD_HASH_METHOD:
+        return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+    return generate_password_hash(password)
+
+
+def _run_bounded(func, *args):
+    if not _thread_slots.acquire(blocking=False):
+        raise PasswordBusy()
+    try:
+        future = _thread_pool.submit(func, *args)
+    except BaseException:
+        _thread_slots.release()
+        raise
+    future.add_done_callback(lambda _: _thread_slots.release())
+    return future.result()
+
+
+def hash_password_bounded(password):
+    """Hash a password on the password executor; raises PasswordBusy when it is saturated"""
+    return _run_bounded(hash_password, password)
+
+
+def verify_password(password_hash, password):
+    """Check a password on the password executor; raises PasswordBusy when it is saturated"""
+    return _run_bounded(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """Tell whether a hash was made with other parameters than the configured method"""
+    global _method_prefix
+
+    if _method_prefix is None:
+        _method_prefix = hash_password('').split('$', 1)[0]
+    return password_hash.split('$', 1)[0] != _method_prefix
+
+
+def _get_process_pool():
+    """Start the hashing process pool on first use, or return None where processes are unavailable"""
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is None and HASH_PROCESSES > 1:
+            try:
+                _process_pool = ProcessPoolExecutor(max_workers=HASH_PROCESSES)
+            except (OSError, NotImplementedError):
+                # e.g. serverless runtimes without /dev/shm for multiprocessing
+                logger.warning('Process pool unavailable; hashing passwords serially')
+        return _process_pool
+
+
+def hash_passwords(passwords):
+    """Hash many passwords, in parallel across HASH_PROCESSES where possible; keeps order"""
+    passwords = list(passwords)
+    pool = _get_process_pool() if len(passwords) > 1 else None
+    if pool is None:
+        return [hash_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (HASH_PROCESSES * 4))
+    return list(pool.map(hash_password, passwords, chunksize=chunksize))
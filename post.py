@@ -1,4 +1,6 @@
 from src.models.user import db
+from src.utils.render import EXCERPT_LENGTH, render_content
+from src.utils.search import install_search_ddl, post_search_vector
 from datetime import datetime
 
 class Post(db.Model):
@@ -12,16 +14,33 @@ class Post(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_published = db.Column(db.Boolean, default=True)
     expires_at = db.Column(db.DateTime, nullable=True)  # For announcements with expiration
+    # Rendered from content whenever it is set; see src.utils.render
+    content_html = db.Column(db.Text, nullable=True)
+    excerpt = db.Column(db.String(EXCERPT_LENGTH + 1), nullable=True)
     
     # Relationships
     votes = db.relationship('Vote', backref='post', lazy=True, cascade='all, delete-orphan')
+    vote_tallies = db.relationship('PostVoteTally', lazy=True, cascade='all, delete-orphan')
     monthly_wins = db.relationship('MonthlyWinner', backref='post', lazy=True)
 
+    # Matches the (created_at, id) keyset used to paginate post listings
+    __table_args__ = (db.Index('ix_post_created_at_id', 'created_at', 'id'),)
+
+    @db.validates('content')
+    def _render_content(self, key, content):
+        """Store the rendered HTML and plain-text excerpt alongside new content"""
+        if content is not None:
+            self.content_html, self.excerpt = render_content(content)
+        return content
+
     def get_vote_count(self, month=None):
         """Get vote count for this post, optionally for a specific month"""
+        from src.models.post_vote_tally import PostVoteTally
+
+        query = db.session.query(db.func.sum(PostVoteTally.count)).filter_by(post_id=self.id)
         if month:
-            return Vote.query.filter_by(post_id=self.id, vote_month=month).count()
-        return len(self.votes)
+            query = query.filter_by(month=month)
+        return query.scalar() or 0
 
     def can_be_voted_on(self):
         """Check if this post can receive votes (only articles)"""
@@ -41,14 +60,49 @@ class Post(db.Model):
             return True
         return self.grade_level == user.grade_level
 
+    @staticmethod
+    def feed_version_scopes(grade_levels):
+        """Get the cache version scopes of feeds that can show posts of these grade levels"""
+        scopes = set()
+        for grade_level in grade_levels:
+            if grade_level == 'all':
+                scopes.update(['junior', 'middle', 'senior'])
+            else:
+                scopes.add(grade_level)
+        return [f'posts:{grade_level}' for grade_level in sorted(scopes)]
+
+    @staticmethod
+    def delete_where(conditions):
+        """Delete matching posts with their votes, tallies and monthly wins.
+
+        Each table is cleared with one set-based DELETE, without loading any
+        objects. Returns the number of posts deleted; the caller commits.
+        """
+        from src.models.vote import Vote
+        from src.models.post_vote_tally import PostVoteTally
+        from src.models.monthly_winner import MonthlyWinner
+        
+        targets = db.select(Post.id).where(*conditions)
+        for model in (MonthlyWinner, PostVoteTally, Vote):
+            db.session.execute(
+                db.delete(model).where(model.post_id.in_(targets)).execution_options(synchronize_session=False)
+            )
+        return db.session.execute(
+            db.delete(Post).where(*conditions).execution_options(synchronize_session=False)
+        ).rowcount
+
+    @staticmethod
+    def summary_options():
+        """Loader options that skip the content columns; summaries use the stored excerpt"""
+        return (db.defer(Post.content), db.defer(Post.content_html))
+
     def __repr__(self):
         return f'<Post {self.title}>'
 
-    def to_dict(self, include_votes=False):
+    def to_dict(self, include_votes=False, vote_counts=None, summary=False):
         result = {
             'id': self.id,
             'title': self.title,
-            'content': self.content,
             'post_type': self.post_type,
             'grade_level': self.grade_level,
             'author_id': self.author_id,
@@ -60,10 +114,60 @@ class Post(db.Model):
             'is_expired': self.is_expired()
         }
         
+        # Summary listings never touch the (deferred) content column
+        if summary:
+            result['excerpt'] = self.excerpt
+        else:
+            result['content'] = self.content
+            result['content_html'] = self.content_html
+            result['excerpt'] = self.excerpt
+        
         if include_votes and self.can_be_voted_on():
-            current_month = datetime.utcnow().strftime('%Y-%m')
-            result['vote_count'] = self.get_vote_count(current_month)
-            result['total_votes'] = self.get_vote_count()
+            if vote_counts is not None:
+                # Counts preloaded by to_dict_list, keyed by post id
+                result['vote_count'], result['total_votes'] = vote_counts.get(self.id, (0, 0))
+            else:
+                current_month = datetime.utcnow().strftime('%Y-%m')
+                result['vote_count'] = self.get_vote_count(current_month)
+                result['total_votes'] = self.get_vote_count()
         
         return result
 
+    @staticmethod
+    def to_dict_list(posts, user_id=None, summary=False, fields=None):
+        """Serialize posts with vote information using a fixed number of queries.
+
+        Authors should already be eager-loaded on ``posts``. Vote counts for
+        the whole list come from one grouped query and, when ``user_id`` is
+        given, the user's votes for the month from one more. ``summary``
+        serializes the excerpt instead of content and ``fields`` limits the
+        keys returned for each post.
+        """
+        from src.models.vote import Vote
+        
+        current_month = Vote.get_current_month()
+        votable_ids = [post.id for post in posts if post.can_be_voted_on()]
+        vote_counts = Vote.get_vote_counts_for_posts(votable_ids, current_month)
+        
+        voted_post_ids = set()
+        if user_id is not None and votable_ids:
+            voted_post_ids = Vote.get_voted_post_ids(user_id, current_month)
+        
+        posts_data = []
+        for post in posts:
+            post_dict = post.to_dict(include_votes=True, vote_counts=vote_counts, summary=summary)
+            if user_id is not None and post.can_be_voted_on():
+                post_dict['user_has_voted'] = post.id in voted_post_ids
+            if fields is not None:
+                post_dict = {key: value for key, value in post_dict.items() if key in fields}
+            posts_data.append(post_dict)
+        
+        return posts_data
+
+
+# Full-text search: an FTS5 table kept in sync by triggers on SQLite, a GIN
+# expression index on Postgres (maintained by the database itself)
+install_search_ddl(Post.__table__)
+post_search_index = db.Index(
+    'ix_post_search', post_search_vector(Post), postgresql_using='gin'
+).ddl_if(dialect='postgresql')
@@ -0,0 +1,84 @@
+from src.models.user import db
+from src.utils.sql import conflict_insert
+
+class PostVoteTally(db.Model):
+    """Number of votes a post received in a month, kept in step with the vote table"""
+    __tablename__ = 'post_vote_tally'
+
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id'), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # Format: YYYY-MM
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Monthly leaderboards read the tallies of one month by count
+    __table_args__ = (db.Index('ix_post_vote_tally_month_count', 'month', 'count'),)
+
+    @staticmethod
+    def increment(post_id, month):
+        """Add one vote to a post's tally inside the caller's transaction; returns the new count"""
+        insert = conflict_insert(db.session, PostVoteTally)
+        if insert is not None:
+            statement = insert.values(post_id=post_id, month=month, count=1).on_conflict_do_update(
+                index_elements=['post_id', 'month'],
+                set_={'count': PostVoteTally.count + 1}
+            )
+            if db.session.get_bind().dialect.insert_returning:
+                return db.session.execute(statement.returning(PostVoteTally.count)).scalar_one()
+            db.session.execute(statement)
+        else:
+            updated = PostVoteTally.query.filter_by(post_id=post_id, month=month).update(
+                {'count': PostVoteTally.count + 1}, synchronize_session=False
+            )
+            if not updated:
+                db.session.add(PostVoteTally(post_id=post_id, month=month, count=1))
+                db.session.flush()
+        
+        return db.session.query(PostVoteTally.count).filter_by(post_id=post_id, month=month).scalar()
+
+    @staticmethod
+    def reconcile(apply=True):
+        """Rebuild tallies from the vote table and report any drift.
+
+        Returns a list of {'post_id', 'month', 'recorded', 'actual'} for every
+        tally that disagreed with the votes. With ``apply`` the drifted rows
+        are corrected and committed.
+        """
+        from src.models.vote import Vote
+        
+        actual = {
+            (row.post_id, row.vote_month): row.count
+            for row in db.session.query(
+                Vote.post_id,
+                Vote.vote_month,
+                db.func.count(Vote.id).label('count')
+            ).group_by(Vote.post_id, Vote.vote_month)
+        }
+        recorded = {
+            (tally.post_id, tally.month): tally.count
+            for tally in db.session.query(PostVoteTally.post_id, PostVoteTally.month, PostVoteTally.count)
+        }
+        
+        drift = []
+        for key in sorted(set(actual) | set(recorded)):
+            if actual.get(key, 0) != recorded.get(key, 0):
+                drift.append({
+                    'post_id': key[0],
+                    'month': key[1],
+                    'recorded': recorded.get(key, 0),
+                    'actual': actual.get(key, 0)
+                })
+        
+        if apply and drift:
+            for entry in drift:
+                tally = db.session.get(PostVoteTally, (entry['post_id'], entry['month']))
+                if entry['actual'] == 0:
+                    db.session.delete(tally)
+                elif tally is None:
+                    db.session.add(PostVoteTally(post_id=entry['post_id'], month=entry['month'], count=entry['actual']))
+                else:
+                    tally.count = entry['actual']
+            db.session.commit()
+        
+        return drift
+
+    def __repr__(self):
+        return f'<PostVoteTally post_id={self.post_id} month={self.month} count={self.count}>'
@@ -1,10 +1,144 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from src.models import db, Post, Vote, MonthlyWinner
+from src.utils.cache import (
+    bump_version, get_cache, get_versions, make_cache_key, make_etag, match_etag, not_modified, with_etag
+)
+from src.utils.pagination import decode_cursor, encode_cursor, get_page_size, paginate_keyset
+from src.utils.search import apply_post_search, highlight, search_terms
+from src.utils import leaderboard
+from src.utils.pubsub import vote_broker
 from datetime import datetime
 
 posts_bp = Blueprint('posts', __name__)
 
+# Home page sections and how many posts each shows by default
+DASHBOARD_SECTIONS = {'principal_note': 1, 'article': 3, 'reminder': 5}
+MAX_SECTION_LIMIT = 50
+
+# Upper bound on how long a shared feed stays cached between writes
+FEED_CACHE_TTL = 60
+
+# Upper bound for the hall of fame, which only changes when winners are
+# recalculated; it also caps staleness should a version bump be lost
+HISTORY_CACHE_TTL = 600
+
+# Keys a client may request with ?fields=
+POST_FIELDS = {
+    'id', 'title', 'content', 'content_html', 'excerpt', 'post_type', 'grade_level', 'author_id',
+    'author_name', 'created_at', 'updated_at', 'is_published', 'expires_at',
+    'is_expired', 'vote_count', 'total_votes', 'user_has_voted'
+}
+
+def get_field_selection(args):
+    """Read ?fields=a,b or ?view=summary into (fields, summary).
+
+    ``summary`` is true whenever content isn't wanted, in which case the
+    query should use Post.summary_options() so the columns are never loaded.
+    Raises ValueError for unknown field names.
+    """
+    fields = args.get('fields')
+    if fields:
+        fields = {field.strip() for field in fields.split(',') if field.strip()}
+        unknown = fields - POST_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return fields, not fields & {'content', 'content_html'}
+    
+    return None, args.get('view') == 'summary'
+
+def feed_keys(*parts):
+    """Get (shared feed key, ETag digest, votes version) for the current user.
+
+    The feed is shared by every user who sees the same grades; the ETag also
+    covers the user's own votes. One version read serves both.
+    """
+    accessible_grades = current_user.get_accessible_grades()
+    *feed_versions, votes_version = get_versions(
+        *Post.feed_version_scopes(accessible_grades), Vote.version_scope(current_user.id)
+    )
+    feed_key = make_cache_key(
+        'feed',
+        *parts,
+        accessible_grades,
+        Vote.get_current_month(),
+        sorted(request.args.items(multi=True)),
+        tuple(feed_versions)
+    )
+    return feed_key, make_etag(feed_key, current_user.id, votes_version), votes_version
+
+def build_shared_feed(posts, summary=False, fields=None, **extra):
+    """Serialize the part of a feed that is the same for every user who can see it"""
+    return dict(
+        extra,
+        posts=Post.to_dict_list(posts, summary=summary, fields=fields),
+        votable=[(index, post.id) for index, post in enumerate(posts) if post.can_be_voted_on()],
+        stale_at=earliest_expiry(posts)
+    )
+
+def cache_shared_feed(key, feed):
+    """Store a shared feed until its first announcement expires, at most FEED_CACHE_TTL"""
+    ttl = FEED_CACHE_TTL
+    if feed['stale_at']:
+        ttl = max(1, min(ttl, int((feed['stale_at'] - datetime.utcnow()).total_seconds())))
+    get_cache().set(key, feed, ttl=ttl)
+
+def with_user_votes(feed, votes_version, fields=None):
+    """Copy a shared feed's posts, adding the current user's user_has_voted flags"""
+    if not feed['votable'] or (fields is not None and 'user_has_voted' not in fields):
+        return feed['posts']
+    
+    voted_post_ids = Vote.get_voted_post_ids(current_user.id, version=votes_version)
+    posts_data = list(feed['posts'])
+    for index, post_id in feed['votable']:
+        posts_data[index] = dict(posts_data[index], user_has_voted=post_id in voted_post_ids)
+    return posts_data
+
+def earliest_expiry(posts):
+    """Get the first future expiry among posts, after which a response goes stale"""
+    now = datetime.utcnow()
+    return min((post.expires_at for post in posts if post.expires_at and post.expires_at > now), default=None)
+
+def publish_vote(post, month, vote_count):
+    """Push a committed vote's new count, and its grade's new top articles, to live streams"""
+    # Concurrent votes can publish out of order; the highest count wins
+    vote_broker.publish(post.grade_level, post.id, {
+        'type': 'count',
+        'post_id': post.id,
+        'month': month,
+        'vote_count': vote_count
+    }, order=(month, vote_count))
+    
+    # Posts for every grade never rank in a grade's top articles
+    if post.grade_level == 'all' or not vote_broker.has_subscribers(post.grade_level):
+        return
+    top_articles = leaderboard.take_top_change(month, post.grade_level, 10)
+    if top_articles is not None:
+        vote_broker.publish(post.grade_level, 'leaderboard', {
+            'type': 'leaderboard',
+            'grade_level': post.grade_level,
+            'top_articles': [{'post_id': post_id, 'vote_count': count} for post_id, count in top_articles]
+        })
+
+def visible_posts_query(user, grade_level=None):
+    """Build a query for published, unexpired posts in the user's grade levels"""
+    query = Post.query.filter_by(is_published=True)
+    
+    # Apply grade level filtering
+    accessible_grades = user.get_accessible_grades()
+    if grade_level and grade_level in accessible_grades:
+        query = query.filter(Post.grade_level.in_([grade_level, 'all']))
+    else:
+        query = query.filter(Post.grade_level.in_(accessible_grades + ['all']))
+    
+    # Filter out expired announcements
+    return query.filter(
+        db.or_(
+            Post.expires_at.is_(None),
+            Post.expires_at > datetime.utcnow()
+        )
+    )
+
 @posts_bp.route('/posts', methods=['GET'])
 @login_required
 def get_posts():
@@ -13,42 +147,138 @@ def get_posts():
         post_type = request.args.get('type')  # article, announcement, reminder, principal_note
         grade_level = request.args.get('grade_level')
         
-        # Build query based on user permissions
-        query = Post.query.filter_by(is_published=True)
+        # Answer revalidation from the version counters alone
+        feed_key, etag, votes_version = feed_keys('posts')
+        matched_tag = match_etag(etag)
+        if matched_tag:
+            return not_modified(matched_tag)
+        
+        try:
+            fields, summary = get_field_selection(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Users who see the same grades share one cached copy of the feed
+        feed = get_cache().get(feed_key)
+        if feed is None:
+            # Build query based on user permissions
+            query = visible_posts_query(current_user, grade_level).options(db.joinedload(Post.author))
+            if summary:
+                query = query.options(*Post.summary_options())
+            
+            # Filter by post type if specified
+            if post_type:
+                query = query.filter_by(post_type=post_type)
+            
+            try:
+                posts, next_cursor = paginate_keyset(
+                    query, (Post.created_at, Post.id),
+                    cursor=request.args.get('cursor'),
+                    limit=get_page_size(request.args)
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            feed = build_shared_feed(posts, summary=summary, fields=fields, next_cursor=next_cursor)
+            cache_shared_feed(feed_key, feed)
         
-        # Filter by post type if specified
-        if post_type:
-            query = query.filter_by(post_type=post_type)
+        # Include the user's own votes on articles
+        posts_data = with_user_votes(feed, votes_version, fields)
         
-        # Apply grade level filtering
-        accessible_grades = current_user.get_accessible_grades()
-        if grade_level and grade_level in accessible_grades:
-            query = query.filter(Post.grade_level.in_([grade_level, 'all']))
-        else:
-            query = query.filter(Post.grade_level.in_(accessible_grades + ['all']))
+        response = jsonify({'posts': posts_data, 'next_cursor': feed['next_cursor']})
+        return with_etag(response, etag, feed['stale_at']), 200
         
-        # Filter out expired announcements
-        query = query.filter(
-            db.or_(
-                Post.expires_at.is_(None),
-                Post.expires_at > datetime.utcnow()
-            )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@posts_bp.route('/dashboard', methods=['GET'])
+@login_required
+def get_dashboard():
+    """Get the newest posts of every home page section in one request"""
+    try:
+        grade_level = request.args.get('grade_level')
+        
+        feed_key, etag, votes_version = feed_keys('dashboard')
+        matched_tag = match_etag(etag)
+        if matched_tag:
+            return not_modified(matched_tag)
+        
+        # Per-section limits, e.g. ?article_limit=5
+        limits = {}
+        for section, default_limit in DASHBOARD_SECTIONS.items():
+            limit = request.args.get(f'{section}_limit', default_limit, type=int)
+            limits[section] = max(0, min(limit, MAX_SECTION_LIMIT))
+        
+        feed = get_cache().get(feed_key)
+        if feed is None:
+            # Rank posts within each section so one statement can apply every limit
+            ranked = visible_posts_query(current_user, grade_level).filter(
+                Post.post_type.in_(list(limits))
+            ).with_entities(
+                Post.id.label('id'),
+                Post.post_type.label('post_type'),
+                db.func.row_number().over(
+                    partition_by=Post.post_type,
+                    order_by=(Post.created_at.desc(), Post.id.desc())
+                ).label('position')
+            ).subquery()
+            
+            posts = Post.query.options(db.joinedload(Post.author)).join(
+                ranked, Post.id == ranked.c.id
+            ).filter(
+                ranked.c.position <= db.case(limits, value=ranked.c.post_type, else_=0)
+            ).order_by(Post.created_at.desc(), Post.id.desc()).all()
+            
+            feed = build_shared_feed(posts)
+            cache_shared_feed(feed_key, feed)
+        
+        # Vote counts and the user's votes are loaded once for all sections
+        sections = {section: [] for section in limits}
+        for post_dict in with_user_votes(feed, votes_version):
+            sections[post_dict['post_type']].append(post_dict)
+        
+        response = jsonify({'sections': sections})
+        return with_etag(response, etag, feed['stale_at']), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@posts_bp.route('/posts/search', methods=['GET'])
+@login_required
+def search_posts():
+    """Search the published, unexpired posts the user can see, best matches first"""
+    try:
+        terms = search_terms(request.args.get('q', ''))
+        if not terms:
+            return jsonify({'error': 'q must contain at least one word'}), 400
+        
+        grade_level = request.args.get('grade_level')
+        post_type = request.args.get('post_type')
+        limit = get_page_size(request.args)
+        
+        # Results are ranked, not keyed, so the cursor carries an offset
+        cursor = request.args.get('cursor')
+        try:
+            offset = decode_cursor(cursor, [int])[0] if cursor else 0
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        query = visible_posts_query(current_user, grade_level).options(
+            db.joinedload(Post.author), *Post.summary_options()
         )
+        if post_type:
+            query = query.filter(Post.post_type == post_type)
         
-        posts = query.order_by(Post.created_at.desc()).all()
+        rows = apply_post_search(query, db.session, Post, terms).offset(offset).limit(limit + 1).all()
+        next_cursor = encode_cursor(offset + limit) if len(rows) > limit else None
+        rows = rows[:limit]
         
-        # Include vote information for articles
-        posts_data = []
-        for post in posts:
-            post_dict = post.to_dict(include_votes=True)
-            if post.can_be_voted_on():
-                current_month = Vote.get_current_month()
-                post_dict['user_has_voted'] = Vote.user_has_voted_this_month(
-                    current_user.id, post.id, current_month
-                )
-            posts_data.append(post_dict)
+        posts_data = Post.to_dict_list([post for post, _, _ in rows], current_user.id, summary=True)
+        for post_dict, (_, score, snippet) in zip(posts_data, rows):
+            post_dict['score'] = round(float(score or 0), 4)
+            post_dict['snippet'] = highlight(snippet)
         
-        return jsonify({'posts': posts_data}), 200
+        return jsonify({'posts': posts_data, 'next_cursor': next_cursor, 'terms': terms}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -58,6 +288,11 @@ def get_posts():
 def get_post(post_id):
     """Get a specific post"""
     try:
+        _, etag, votes_version = feed_keys('post', post_id)
+        matched_tag = match_etag(etag)
+        if matched_tag:
+            return not_modified(matched_tag)
+        
         post = Post.query.get_or_404(post_id)
         
         # Check if user can access this post
@@ -68,10 +303,11 @@ def get_post(post_id):
         if post.can_be_voted_on():
             current_month = Vote.get_current_month()
             post_dict['user_has_voted'] = Vote.user_has_voted_this_month(
-                current_user.id, post.id, current_month
+                current_user.id, post.id, current_month, votes_version
             )
         
-        return jsonify({'post': post_dict}), 200
+        response = jsonify({'post': post_dict})
+        return with_etag(response, etag, earliest_expiry([post])), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -124,6 +360,7 @@ def create_post():
         
         db.session.add(post)
         db.session.commit()
+        bump_version(*Post.feed_version_scopes([post.grade_level]))
         
         return jsonify({
             'message': 'Post created successfully',
@@ -139,7 +376,10 @@ def create_post():
 def vote_on_post(post_id):
     """Vote on an article"""
     try:
-        post = Post.query.get_or_404(post_id)
+        # Only the columns the checks need; content is never loaded
+        post = Post.query.options(
+            db.load_only(Post.post_type, Post.grade_level, Post.is_published)
+        ).get_or_404(post_id)
         
         # Check if post can be voted on
         if not post.can_be_voted_on():
@@ -151,23 +391,24 @@ def vote_on_post(post_id):
         
         current_month = Vote.get_current_month()
         
-        # Check if user has already voted this month
+        # Known duplicates are answered from the voted-set cache
         if Vote.user_has_voted_this_month(current_user.id, post_id, current_month):
             return jsonify({'error': 'You have already voted on this article this month'}), 400
         
-        # Create vote
-        vote = Vote(
-            user_id=current_user.id,
-            post_id=post_id,
-            vote_month=current_month
-        )
+        # Insert and count in one transaction; a duplicate inserts nothing
+        vote_count = Vote.record_vote(current_user.id, post_id, current_month)
+        if vote_count is None:
+            db.session.rollback()
+            return jsonify({'error': 'You have already voted on this article this month'}), 400
         
-        db.session.add(vote)
         db.session.commit()
+        bump_version(*Post.feed_version_scopes([post.grade_level]), Vote.version_scope(current_user.id))
+        leaderboard.record_vote(current_month, post.grade_level, post_id, vote_count)
+        publish_vote(post, current_month, vote_count)
         
         return jsonify({
             'message': 'Vote recorded successfully',
-            'vote_count': post.get_vote_count(current_month)
+            'vote_count': vote_count
         }), 201
         
     except Exception as e:
@@ -190,6 +431,11 @@ def get_monthly_winners():
         if grade_level and grade_level not in accessible_grades:
             return jsonify({'error': 'Access denied to this grade level'}), 403
         
+        etag = make_etag('winners', month, grade_level, accessible_grades, get_versions('winners'))
+        matched_tag = match_etag(etag)
+        if matched_tag:
+            return not_modified(matched_tag)
+        
         if grade_level:
             winners = MonthlyWinner.get_winners_for_month(month, grade_level)
         else:
@@ -198,10 +444,53 @@ def get_monthly_winners():
         
         winners_data = [winner.to_dict() for winner in winners]
         
-        return jsonify({
+        response = jsonify({
             'winners': winners_data,
             'month': month
-        }), 200
+        })
+        return with_etag(response, etag), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@posts_bp.route('/posts/winners/history', methods=['GET'])
+@login_required
+def get_winners_history():
+    """Get the hall of fame: winners of every past month, grouped by month"""
+    try:
+        grade_level = request.args.get('grade_level')
+        year = request.args.get('year')
+        current_month = Vote.get_current_month()
+        
+        accessible_grades = current_user.get_accessible_grades()
+        if grade_level and grade_level not in accessible_grades:
+            return jsonify({'error': 'Access denied to this grade level'}), 403
+        
+        if year and not (year.isdigit() and len(year) == 4):
+            return jsonify({'error': 'year must be in YYYY format'}), 400
+        
+        grade_levels = [grade_level] if grade_level else accessible_grades
+        versions = get_versions('winners')
+        etag = make_etag('winners_history', year, grade_levels, current_month, versions)
+        matched_tag = match_etag(etag)
+        if matched_tag:
+            return not_modified(matched_tag)
+        
+        # Past months only change when winners are recalculated or a winning
+        # post or author is edited, all of which bump 'winners' for every
+        # process; the TTL only bounds the damage of a lost bump
+        key = make_cache_key('winners_history', year, grade_levels, current_month, versions)
+        history = get_cache().get(key)
+        if history is None:
+            history = []
+            for winner in MonthlyWinner.get_winners_history(grade_levels, current_month, year):
+                if not history or history[-1]['month'] != winner.month:
+                    history.append({'month': winner.month, 'winners': []})
+                history[-1]['winners'].append(winner.to_dict())
+            get_cache().set(key, history, ttl=HISTORY_CACHE_TTL)
+        
+        response = jsonify({'history': history})
+        return with_etag(response, etag), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -219,21 +508,25 @@ def get_top_articles():
         if grade_level and grade_level not in accessible_grades:
             return jsonify({'error': 'Access denied to this grade level'}), 403
         
-        if grade_level:
-            top_articles = Vote.get_monthly_vote_counts(current_month, grade_level)
-        else:
-            all_articles = Vote.get_monthly_vote_counts(current_month)
-            top_articles = [a for a in all_articles if a.grade_level in accessible_grades]
+        try:
+            fields, summary = get_field_selection(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Counts and article metadata come from memory; only the user's votes are queried
+        grade_levels = [grade_level] if grade_level else accessible_grades
+        top_articles = leaderboard.get_top_articles(current_month, grade_levels, 10)
+        articles = leaderboard.get_articles([post_id for post_id, _ in top_articles], summary=summary)
+        voted_post_ids = Vote.get_voted_post_ids(current_user.id, current_month) if top_articles else set()
         
         articles_data = []
-        for article in top_articles[:10]:  # Top 10
-            post = Post.query.get(article.id)
-            if post:
-                post_dict = post.to_dict()
-                post_dict['vote_count'] = article.vote_count
-                post_dict['user_has_voted'] = Vote.user_has_voted_this_month(
-                    current_user.id, post.id, current_month
-                )
+        for post_id, vote_count in top_articles:  # Top 10
+            if post_id in articles:
+                post_dict = dict(articles[post_id])
+                post_dict['vote_count'] = vote_count
+                post_dict['user_has_voted'] = post_id in voted_post_ids
+                if fields is not None:
+                    post_dict = {key: value for key, value in post_dict.items() if key in fields}
                 articles_data.append(post_dict)
         
         return jsonify({
@@ -0,0 +1,101 @@
+import threading
+
+
+class BrokerFull(Exception):
+    """Raised when a broker already has its maximum number of subscribers"""
+
+
+class Subscription:
+    """One listener's pending messages, coalesced by topic and key.
+
+    A newer message replaces a pending one with the same topic and key
+    unless its ``order`` is lower (it was overtaken in flight), so a slow
+    listener holds at most ``max_pending`` messages however busy the topic
+    is. Beyond that, messages are dropped and the listener is flagged to
+    resynchronize from the regular endpoints.
+    """
+
+    __slots__ = ('topics', 'max_pending', 'pending', 'overflowed', 'ready', '_lock')
+
+    def __init__(self, topics, max_pending):
+        self.topics = tuple(topics)
+        self.max_pending = max_pending
+        self.pending = {}
+        self.overflowed = False
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def offer(self, topic, key, message, order=None):
+        with self._lock:
+            pending = self.pending.get((topic, key))
+            if pending is not None:
+                if order is None or pending[0] is None or order >= pending[0]:
+                    self.pending[(topic, key)] = (order, message)
+            elif len(self.pending) < self.max_pending:
+                self.pending[(topic, key)] = (order, message)
+            else:
+                self.overflowed = True
+        self.ready.set()
+
+    def wait(self, timeout):
+        """Block until a message arrives or ``timeout`` seconds pass; True if one arrived"""
+        return self.ready.wait(timeout)
+
+    def drain(self):
+        """Take every pending message; returns (messages, overflowed)"""
+        with self._lock:
+            pending, self.pending = self.pending, {}
+            overflowed, self.overflowed = self.overflowed, False
+            self.ready.clear()
+        return [message for _, message in pending.values()], overflowed
+
+
+class Broker:
+    """In-process publish/subscribe hub keyed by topic"""
+
+    def __init__(self, max_subscribers=5000, max_pending=500):
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self._topics = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics):
+        """Register a listener for ``topics``; raises BrokerFull at capacity"""
+        subscription = Subscription(topics, self.max_pending)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise BrokerFull()
+            for topic in subscription.topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                listeners = self._topics.get(topic)
+                if listeners and subscription in listeners:
+                    listeners.discard(subscription)
+                    if not listeners:
+                        del self._topics[topic]
+            self._count -= 1
+
+    def has_subscribers(self, topic):
+        with self._lock:
+            return bool(self._topics.get(topic))
+
+    def publish(self, topic, key, message, order=None):
+        """Offer a message to every listener of ``topic`` without blocking on any of them.
+
+        ``order`` ranks messages with the same topic and key, e.g. by count:
+        a pending message is kept over a later-published one of lower order.
+        """
+        with self._lock:
+            listeners = list(self._topics.get(topic, ()))
+        for subscription in listeners:
+            subscription.offer(topic, key, message, order)
+
+
+# Live vote counts, published by vote_on_post under the post's grade level
+vote_broker = Broker()
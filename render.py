@@ -0,0 +1,138 @@
+import hashlib
+import html
+import re
+from sqlalchemy import bindparam, select
+from src.utils.cache import InMemoryCache
+
+# Bump when the output of render_content changes, then run
+# `flask rerender-content` to bring stored HTML up to date
+RENDER_VERSION = 2
+
+# Plain-text excerpts are cut to about this many characters, at a word boundary
+EXCERPT_LENGTH = 200
+
+# sha1 of (RENDER_VERSION, source) -> (html, excerpt). Renders are pure, so
+# entries never go stale; LRU eviction bounds the size.
+_renders = InMemoryCache(max_entries=2048, default_ttl=0)
+
+# The markdown subset the site's content is written in: #/##/### headings,
+# ***bold italic***, **bold**, *italic*, "-"/"*" and "1." lists, blank-line
+# paragraphs and line breaks. Anything else is left as escaped text. Only
+# one- and two-digit numbers start list items, so a line such as
+# "1985. Established" stays a paragraph.
+_HEADING = re.compile(r'(#{1,3})\s+(.*)')
+_LIST_ITEM = re.compile(r'(?:([-*+])|\d{1,2}[.)])\s+(.*)')
+_BOLD_ITALIC = re.compile(r'\*\*\*(.+?)\*\*\*')
+_BOLD = re.compile(r'\*\*(.+?)\*\*')
+_ITALIC = re.compile(r'\*([^*\s](?:[^*]*[^*\s])?)\*')
+_BLOCK_MARKER = re.compile(r'^(?:#{1,6}|[-*+]|\d{1,2}[.)])\s+')
+
+
+def _inline(text):
+    # Triple markers first, or bold and italic would close out of order
+    text = _BOLD_ITALIC.sub(r'<strong><em>\1</em></strong>', text)
+    return _ITALIC.sub(r'<em>\1</em>', _BOLD.sub(r'<strong>\1</strong>', text))
+
+
+def render_html(source):
+    """Render markdown to HTML.
+
+    The source is HTML-escaped before any markup is added, so the only tags
+    in the output are the ones emitted here and none carry attributes.
+    """
+    blocks = []
+    paragraph = []
+    items = []
+    list_tag = None
+
+    def end_paragraph():
+        if paragraph:
+            blocks.append('<p>' + '<br>'.join(paragraph) + '</p>')
+            paragraph.clear()
+
+    def end_list():
+        if items:
+            blocks.append(f'<{list_tag}>' + ''.join(f'<li>{item}</li>' for item in items) + f'</{list_tag}>')
+            items.clear()
+
+    for line in html.escape(source).splitlines():
+        line = line.strip()
+        heading = _HEADING.match(line)
+        item = _LIST_ITEM.match(line)
+        if not line:
+            end_paragraph()
+            end_list()
+        elif heading:
+            end_paragraph()
+            end_list()
+            level = len(heading.group(1))
+            blocks.append(f'<h{level}>{_inline(heading.group(2))}</h{level}>')
+        elif item:
+            end_paragraph()
+            tag = 'ul' if item.group(1) else 'ol'
+            if tag != list_tag:
+                end_list()
+                list_tag = tag
+            items.append(_inline(item.group(2)))
+        else:
+            end_list()
+            paragraph.append(_inline(line))
+    end_paragraph()
+    end_list()
+    return '\n'.join(blocks)
+
+
+def render_excerpt(source):
+    """Reduce markdown to plain text and cut it to EXCERPT_LENGTH, marked when truncated"""
+    lines = (_BLOCK_MARKER.sub('', line.strip()) for line in source.splitlines())
+    text = ' '.join(' '.join(lines).split())
+    text = _ITALIC.sub(r'\1', _BOLD.sub(r'\1', _BOLD_ITALIC.sub(r'\1', text)))
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    cut = text[:EXCERPT_LENGTH + 1]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut[:EXCERPT_LENGTH].rstrip() + '…'
+
+
+def render_content(source):
+    """Get (html, excerpt) for markdown source, reusing earlier renders of the same text"""
+    key = hashlib.sha1(f'{RENDER_VERSION}:{source}'.encode()).hexdigest()
+    rendered = _renders.get(key)
+    if rendered is None:
+        rendered = (render_html(source), render_excerpt(source))
+        _renders.set(key, rendered, ttl=0)
+    return rendered
+
+
+def rerender_rows(session, model, batch_size=500):
+    """Re-render the stored HTML and excerpt of every row of ``model``.
+
+    Rows are read in id order, ``batch_size`` at a time, and only rows whose
+    output changed are written, with one executemany UPDATE per batch that
+    leaves updated_at alone. Commits after each batch; returns the number of
+    rows updated.
+    """
+    table = model.__table__
+    update = table.update().where(table.c.id == bindparam('row_id')).values(
+        content_html=bindparam('html'), excerpt=bindparam('text'), updated_at=table.c.updated_at
+    )
+    updated = 0
+    last_id = 0
+    while True:
+        rows = session.execute(
+            select(model.id, model.content, model.content_html, model.excerpt)
+            .where(model.id > last_id).order_by(model.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        last_id = rows[-1].id
+        changes = []
+        for row in rows:
+            content_html, excerpt = render_content(row.content)
+            if (content_html, excerpt) != (row.content_html, row.excerpt):
+                changes.append({'row_id': row.id, 'html': content_html, 'text': excerpt})
+        if changes:
+            session.connection().execute(update, changes)
+            updated += len(changes)
+        session.commit()
@@ -0,0 +1,42 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+
+
+def upgrade_schema(engine, metadata, skip_indexes=()):
+    """Bring an existing database up to the models in ``metadata``.
+
+    Creates missing tables, adds missing columns to existing tables and
+    creates missing indexes, except ``skip_indexes`` (ones built elsewhere,
+    such as dialect-specific search indexes); nothing is dropped or altered.
+    Only nullable columns (or ones with a server default) can be added this
+    way. Returns a description of each table and column added.
+    """
+    changes = []
+    with engine.begin() as connection:
+        existing = set(inspect(connection).get_table_names())
+        for table in metadata.sorted_tables:
+            if table.name not in existing:
+                table.create(connection)
+                changes.append(f'created table {table.name}')
+        # Reflect again so the checks below see the tables just created
+        inspector = inspect(connection)
+        preparer = connection.dialect.identifier_preparer
+        for table in metadata.sorted_tables:
+            columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    raise RuntimeError(
+                        f'{table.name}.{column.name} is NOT NULL without a server default; add it by hand'
+                    )
+                connection.execute(text(
+                    f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} '
+                    f'{column.type.compile(dialect=connection.dialect)}'
+                ))
+                changes.append(f'added column {table.name}.{column.name}')
+            # Reflection misses expression indexes on some dialects (SQLite),
+            # so let the database skip the ones that exist
+            for index in table.indexes - set(skip_indexes):
+                connection.execute(CreateIndex(index, if_not_exists=True))
+    return changes
@@ -3,6 +3,7 @@
 // Global variables
 let currentUser = null;
 let currentSection = 'home';
+let voteStream = null;
 
 // API Base URL
 const API_BASE = '/api';
@@ -181,6 +182,7 @@ async function logout() {
         
         if (response.ok) {
             currentUser = null;
+            stopVoteStream();
             showAlert('Logged out successfully', 'info');
             showUnauthenticatedUI();
             showSection('home');
@@ -194,50 +196,43 @@ async function logout() {
 // Content Loading Functions
 async function loadHomeContent() {
     try {
-        // Load principal's note
-        const principalResponse = await fetch(`${API_BASE}/posts?type=principal_note`, {
+        // Load every home page section in one request
+        const dashboardResponse = await fetch(`${API_BASE}/dashboard`, {
             credentials: 'include'
         });
-        const principalData = await principalResponse.json();
+        const dashboardData = await dashboardResponse.json();
+        const sections = dashboardData.sections || {};
         
-        if (principalData.posts && principalData.posts.length > 0) {
-            const note = principalData.posts[0];
+        // Principal's note
+        const principalNotes = sections.principal_note || [];
+        if (principalNotes.length > 0) {
+            const note = principalNotes[0];
             document.getElementById('principal-note').innerHTML = `
                 <h6>${note.title}</h6>
-                <p>${note.content.replace(/\n/g, '<br>')}</p>
+                ${contentHtml(note)}
                 <small class="text-muted">Updated: ${new Date(note.updated_at).toLocaleDateString()}</small>
             `;
         }
         
-        // Load recent articles
-        const articlesResponse = await fetch(`${API_BASE}/posts?type=article`, {
-            credentials: 'include'
-        });
-        const articlesData = await articlesResponse.json();
-        
-        if (articlesData.posts && articlesData.posts.length > 0) {
-            const recentArticles = articlesData.posts.slice(0, 3);
+        // Recent articles
+        const recentArticles = sections.article || [];
+        if (recentArticles.length > 0) {
             document.getElementById('recent-news').innerHTML = recentArticles.map(article => `
                 <div class="mb-3">
                     <h6>${article.title}</h6>
-                    <p class="text-muted small">${article.content.substring(0, 150)}...</p>
+                    <p class="text-muted small">${escapeHtml(article.excerpt || article.content || '')}</p>
                     <small class="text-muted">By ${article.author_name} • ${new Date(article.created_at).toLocaleDateString()}</small>
                 </div>
             `).join('<hr>');
         }
         
-        // Load important reminders
-        const remindersResponse = await fetch(`${API_BASE}/posts?type=reminder`, {
-            credentials: 'include'
-        });
-        const remindersData = await remindersResponse.json();
-        
-        if (remindersData.posts && remindersData.posts.length > 0) {
-            const importantReminders = remindersData.posts.slice(0, 5);
+        // Important reminders
+        const importantReminders = sections.reminder || [];
+        if (importantReminders.length > 0) {
             document.getElementById('important-reminders').innerHTML = importantReminders.map(reminder => `
                 <div class="mb-2">
                     <strong>${reminder.title}</strong>
-                    <p class="small mb-1">${reminder.content}</p>
+                    <div class="small mb-1">${contentHtml(reminder)}</div>
                     <small class="text-muted">${new Date(reminder.created_at).toLocaleDateString()}</small>
                 </div>
             `).join('<hr>');
@@ -283,35 +278,67 @@ async function loadMonthlyWinners() {
     }
 }
 
+async function loadTopArticles() {
+    const topResponse = await fetch(`${API_BASE}/posts/top-articles`, {
+        credentials: 'include'
+    });
+    const topData = await topResponse.json();
+    
+    if (topData.top_articles && topData.top_articles.length > 0) {
+        document.getElementById('top-articles').innerHTML = topData.top_articles.map(article => 
+            createPostCard(article, true)
+        ).join('');
+    } else {
+        document.getElementById('top-articles').innerHTML = '<p class="text-muted">No articles have been voted on this month.</p>';
+    }
+}
+
+// Post listings are paged by the server; "Load more" follows next_cursor
+async function loadPagedPosts(containerId, path, renderItem, emptyMessage, cursor = null) {
+    const container = document.getElementById(containerId);
+    const [base, query] = path.split('?');
+    const params = new URLSearchParams(query);
+    if (cursor) params.set('cursor', cursor);
+    
+    const response = await fetch(`${API_BASE}${base}?${params}`, {
+        credentials: 'include'
+    });
+    const data = await response.json();
+    if (!data.posts) throw new Error(data.error || 'Failed to load posts');
+    
+    const existingButton = document.getElementById(`${containerId}-load-more`);
+    if (existingButton) existingButton.remove();
+    
+    const postsHtml = data.posts.map(renderItem).join('');
+    if (cursor) {
+        container.insertAdjacentHTML('beforeend', postsHtml);
+    } else {
+        container.innerHTML = postsHtml || `<p class="text-muted">${emptyMessage}</p>`;
+    }
+    
+    if (data.next_cursor) {
+        const button = document.createElement('button');
+        button.id = `${containerId}-load-more`;
+        button.className = 'btn btn-sm btn-outline-secondary w-100 mt-2';
+        button.textContent = 'Load more';
+        button.addEventListener('click', () => {
+            loadPagedPosts(containerId, path, renderItem, emptyMessage, data.next_cursor).catch(error => {
+                console.error('Error loading more posts:', error);
+                showAlert('Error loading more posts', 'danger');
+            });
+        });
+        container.appendChild(button);
+    }
+}
+
 async function loadArticles() {
     try {
         // Load top articles
-        const topResponse = await fetch(`${API_BASE}/posts/top-articles`, {
-            credentials: 'include'
-        });
-        const topData = await topResponse.json();
-        
-        if (topData.top_articles && topData.top_articles.length > 0) {
-            document.getElementById('top-articles').innerHTML = topData.top_articles.map(article => 
-                createPostCard(article, true)
-            ).join('');
-        } else {
-            document.getElementById('top-articles').innerHTML = '<p class="text-muted">No articles have been voted on this month.</p>';
-        }
+        await loadTopArticles();
         
         // Load all articles
-        const allResponse = await fetch(`${API_BASE}/posts?type=article`, {
-            credentials: 'include'
-        });
-        const allData = await allResponse.json();
-        
-        if (allData.posts && allData.posts.length > 0) {
-            document.getElementById('all-articles').innerHTML = allData.posts.map(article => 
-                createPostCard(article, true)
-            ).join('');
-        } else {
-            document.getElementById('all-articles').innerHTML = '<p class="text-muted">No articles available.</p>';
-        }
+        await loadPagedPosts('all-articles', '/posts?type=article', article => createPostCard(article, true),
+            'No articles available.');
         
     } catch (error) {
         console.error('Error loading articles:', error);
@@ -322,18 +349,8 @@ async function loadArticles() {
 
 async function loadAnnouncements() {
     try {
-        const response = await fetch(`${API_BASE}/posts?type=announcement`, {
-            credentials: 'include'
-        });
-        const data = await response.json();
-        
-        if (data.posts && data.posts.length > 0) {
-            document.getElementById('announcements-content').innerHTML = data.posts.map(post => 
-                createPostCard(post, false)
-            ).join('');
-        } else {
-            document.getElementById('announcements-content').innerHTML = '<p class="text-muted">No announcements available.</p>';
-        }
+        await loadPagedPosts('announcements-content', '/posts?type=announcement', post => createPostCard(post, false),
+            'No announcements available.');
     } catch (error) {
         console.error('Error loading announcements:', error);
         document.getElementById('announcements-content').innerHTML = '<p class="text-danger">Error loading announcements.</p>';
@@ -342,24 +359,72 @@ async function loadAnnouncements() {
 
 async function loadReminders() {
     try {
-        const response = await fetch(`${API_BASE}/posts?type=reminder`, {
-            credentials: 'include'
-        });
-        const data = await response.json();
-        
-        if (data.posts && data.posts.length > 0) {
-            document.getElementById('reminders-content').innerHTML = data.posts.map(post => 
-                createPostCard(post, false)
-            ).join('');
-        } else {
-            document.getElementById('reminders-content').innerHTML = '<p class="text-muted">No reminders available.</p>';
-        }
+        await loadPagedPosts('reminders-content', '/posts?type=reminder', post => createPostCard(post, false),
+            'No reminders available.');
     } catch (error) {
         console.error('Error loading reminders:', error);
         document.getElementById('reminders-content').innerHTML = '<p class="text-danger">Error loading reminders.</p>';
     }
 }
 
+function renderUserItem(user) {
+    return `
+        <div class="user-item">
+            <div class="d-flex justify-content-between align-items-center">
+                <div>
+                    <strong>${user.first_name} ${user.last_name}</strong>
+                    <br>
+                    <small class="text-muted">${user.username} • ${user.email}</small>
+                    <br>
+                    <span class="badge role-badge">${user.role}</span>
+                    <span class="badge grade-badge">${user.grade_level}</span>
+                </div>
+                <div>
+                    <button class="btn btn-sm btn-outline-primary" onclick="editUser(${user.id})">
+                        <i class="fas fa-edit"></i>
+                    </button>
+                    ${user.id !== currentUser.id ? `
+                        <button class="btn btn-sm btn-outline-danger" onclick="deleteUser(${user.id})">
+                            <i class="fas fa-trash"></i>
+                        </button>
+                    ` : ''}
+                </div>
+            </div>
+        </div>
+    `;
+}
+
+// Users are paged by the server; "Load more" follows next_cursor
+async function loadUserManagement(cursor = null) {
+    const container = document.getElementById('user-management');
+    const params = new URLSearchParams();
+    if (cursor) params.set('cursor', cursor);
+    
+    const usersResponse = await fetch(`${API_BASE}/admin/users?${params}`, {
+        credentials: 'include'
+    });
+    const usersData = await usersResponse.json();
+    if (!usersData.users) return;
+    
+    const existingButton = document.getElementById('load-more-users');
+    if (existingButton) existingButton.remove();
+    
+    const usersHtml = usersData.users.map(renderUserItem).join('');
+    if (cursor) {
+        container.insertAdjacentHTML('beforeend', usersHtml);
+    } else {
+        const total = usersData.total !== null ? `<p class="text-muted small">${usersData.total} users</p>` : '';
+        container.innerHTML = total + usersHtml;
+    }
+    
+    if (usersData.next_cursor) {
+        container.insertAdjacentHTML('beforeend', `
+            <button id="load-more-users" class="btn btn-sm btn-outline-secondary w-100 mt-2"
+                    onclick="loadUserManagement('${usersData.next_cursor}')">Load more</button>
+        `);
+    }
+}
+
 async function loadAdminContent() {
     if (!currentUser || currentUser.role !== 'admin') {
         document.getElementById('admin-section').innerHTML = '<p class="text-danger">Access denied.</p>';
@@ -381,72 +446,40 @@ async function loadAdminContent() {
         }
         
         // Load users for management
-        const usersResponse = await fetch(`${API_BASE}/admin/users`, {
-            credentials: 'include'
-        });
-        const usersData = await usersResponse.json();
+        await loadUserManagement();
         
-        if (usersData.users) {
-            document.getElementById('user-management').innerHTML = usersData.users.map(user => `
-                <div class="user-item">
-                    <div class="d-flex justify-content-between align-items-center">
-                        <div>
-                            <strong>${user.first_name} ${user.last_name}</strong>
-                            <br>
-                            <small class="text-muted">${user.username} • ${user.email}</small>
-                            <br>
-                            <span class="badge role-badge">${user.role}</span>
-                            <span class="badge grade-badge">${user.grade_level}</span>
-                        </div>
-                        <div>
-                            <button class="btn btn-sm btn-outline-primary" onclick="editUser(${user.id})">
-                                <i class="fas fa-edit"></i>
-                            </button>
-                            ${user.id !== currentUser.id ? `
-                                <button class="btn btn-sm btn-outline-danger" onclick="deleteUser(${user.id})">
-                                    <i class="fas fa-trash"></i>
-                                </button>
-                            ` : ''}
-                        </div>
-                    </div>
-                </div>
-            `).join('');
-        }
-        
-        // Load posts for management
-        const postsResponse = await fetch(`${API_BASE}/admin/posts/all`, {
-            credentials: 'include'
-        });
-        const postsData = await postsResponse.json();
-        
-        if (postsData.posts) {
-            document.getElementById('content-management').innerHTML = postsData.posts.slice(0, 10).map(post => `
-                <div class="user-item">
-                    <div class="d-flex justify-content-between align-items-center">
-                        <div>
-                            <strong>${post.title}</strong>
-                            <br>
-                            <small class="text-muted">By ${post.author_name} • ${new Date(post.created_at).toLocaleDateString()}</small>
-                            <br>
-                            <span class="badge bg-info">${post.post_type}</span>
-                            <span class="badge grade-badge">${post.grade_level}</span>
-                            ${post.is_published ? '<span class="badge bg-success">Published</span>' : '<span class="badge bg-warning">Draft</span>'}
-                        </div>
-                        <div>
-                            <button class="btn btn-sm btn-outline-danger" onclick="deletePost(${post.id})">
-                                <i class="fas fa-trash"></i>
-                            </button>
-                        </div>
-                    </div>
-                </div>
-            `).join('');
-        }
+        // Load posts for management, ten at a time
+        await loadPagedPosts('content-management', '/admin/posts/all?view=summary&limit=10', renderAdminPostItem,
+            'No posts yet.');
         
     } catch (error) {
         console.error('Error loading admin content:', error);
     }
 }
 
+function renderAdminPostItem(post) {
+    return `
+        <div class="user-item">
+            <div class="d-flex justify-content-between align-items-center">
+                <div>
+                    <strong>${post.title}</strong>
+                    <br>
+                    <small class="text-muted">By ${post.author_name} • ${new Date(post.created_at).toLocaleDateString()}</small>
+                    <br>
+                    <span class="badge bg-info">${post.post_type}</span>
+                    <span class="badge grade-badge">${post.grade_level}</span>
+                    ${post.is_published ? '<span class="badge bg-success">Published</span>' : '<span class="badge bg-warning">Draft</span>'}
+                </div>
+                <div>
+                    <button class="btn btn-sm btn-outline-danger" onclick="deletePost(${post.id})">
+                        <i class="fas fa-trash"></i>
+                    </button>
+                </div>
+            </div>
+        </div>
+    `;
+}
+
 // Post Management Functions
 async function createPost() {
     const postData = {
@@ -514,10 +547,13 @@ async function voteOnPost(postId) {
         
         if (response.ok) {
             showAlert('Vote recorded successfully!', 'success');
-            // Reload articles to update vote counts
-            if (currentSection === 'articles') {
-                loadArticles();
-            }
+            // Update in place; other users' votes arrive through the vote stream
+            updateVoteCount(postId, data.vote_count);
+            document.querySelectorAll(`[data-vote-button="${postId}"]`).forEach(button => {
+                button.classList.add('disabled');
+                button.disabled = true;
+                button.innerHTML = '<i class="fas fa-thumbs-up me-1"></i> Voted';
+            });
         } else {
             showAlert(data.error || 'Failed to vote', 'danger');
         }
@@ -545,18 +581,19 @@ function createPostCard(post, showVoting) {
                 </div>
                 <h5 class="post-title">${post.title}</h5>
                 <div class="post-content">
-                    ${post.content.replace(/\n/g, '<br>')}
+                    ${contentHtml(post)}
                 </div>
                 ${showVoting ? `
                     <div class="post-actions">
                         <div>
                             <span class="text-muted">
                                 <i class="fas fa-thumbs-up me-1"></i>
-                                ${voteCount} vote${voteCount !== 1 ? 's' : ''} this month
+                                <span data-vote-count="${post.id}">${formatVoteCount(voteCount)}</span>
                             </span>
                         </div>
                         ${canVote ? `
                             <button class="btn vote-btn ${hasVoted ? 'disabled' : ''}" 
+                                    data-vote-button="${post.id}"
                                     onclick="voteOnPost(${post.id})" 
                                     ${hasVoted ? 'disabled' : ''}>
                                 <i class="fas fa-thumbs-up me-1"></i>
@@ -570,6 +607,59 @@ function createPostCard(post, showVoting) {
     `;
 }
 
+// Plain text from the API (titles, excerpts) must be escaped before it goes into innerHTML
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML.replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+}
+
+// Stored HTML, or the escaped source for rows rendered before content_html existed
+function contentHtml(item) {
+    if (item.content_html != null) {
+        return item.content_html;
+    }
+    return escapeHtml(item.content || '').replace(/\n/g, '<br>');
+}
+
+function formatVoteCount(voteCount) {
+    return `${voteCount} vote${voteCount !== 1 ? 's' : ''} this month`;
+}
+
+function updateVoteCount(postId, voteCount) {
+    document.querySelectorAll(`[data-vote-count="${postId}"]`).forEach(el => {
+        el.textContent = formatVoteCount(voteCount);
+    });
+}
+
+// Live vote counts, pushed by the server instead of polled
+function startVoteStream() {
+    if (voteStream || !window.EventSource) {
+        return;
+    }
+    
+    voteStream = new EventSource(`${API_BASE}/stream/votes`, { withCredentials: true });
+    voteStream.addEventListener('votes', event => {
+        const data = JSON.parse(event.data);
+        data.counts.forEach(update => updateVoteCount(update.post_id, update.vote_count));
+        if (currentSection === 'articles' && Object.keys(data.top_articles).length > 0) {
+            loadTopArticles();
+        }
+    });
+    voteStream.addEventListener('resync', () => {
+        if (currentSection === 'articles') {
+            loadArticles();
+        }
+    });
+}
+
+function stopVoteStream() {
+    if (voteStream) {
+        voteStream.close();
+        voteStream = null;
+    }
+}
+
 function showSection(section) {
     // Hide all sections
     document.querySelectorAll('.content-section').forEach(el => {
@@ -594,6 +684,7 @@ function showSection(section) {
             break;
         case 'articles':
             loadArticles();
+            startVoteStream();
             break;
         case 'announcements':
             loadAnnouncements();
@@ -700,11 +791,12 @@ async function deleteUser(userId) {
             credentials: 'include'
         });
         
+        const data = await response.json();
         if (response.ok) {
-            showAlert('User deleted successfully', 'success');
+            // Deletion continues in the background; the user is already deactivated
+            showAlert(data.message || 'User deleted successfully', 'success');
             loadAdminContent();
         } else {
-            const data = await response.json();
             showAlert(data.error || 'Failed to delete user', 'danger');
         }
     } catch (error) {
@@ -792,7 +884,7 @@ function displayAboutSections(sections) {
                     <h5 class="mb-0">${escapeHtml(section.title)}</h5>
                 </div>
                 <div class="card-body">
-                    <div class="about-content">${formatMarkdown(section.content)}</div>
+                    <div class="about-content">${contentHtml(section)}</div>
                 </div>
             </div>
         `;
@@ -981,19 +1073,3 @@ async function deleteAboutSection(sectionId) {
     }
 }
 
-// Simple markdown formatter
-function formatMarkdown(text) {
-    return text
-        .replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>')
-        .replace(/\*(.*?)\*/g, '<em>$1</em>')
-        .replace(/^### (.*$)/gim, '<h3>$1</h3>')
-        .replace(/^## (.*$)/gim, '<h2>$1</h2>')
-        .replace(/^# (.*$)/gim, '<h1>$1</h1>')
-        .replace(/\n\n/g, '</p><p>')
-        .replace(/\n/g, '<br>')
-        .replace(/^(.*)$/gim, '<p>$1</p>')
-        .replace(/<p><\/p>/g, '')
-        .replace(/<p><h/g, '<h')
-        .replace(/<\/h([1-6])><\/p>/g, '</h$1>');
-}
-
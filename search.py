@@ -0,0 +1,136 @@
+import html
+import re
+from sqlalchemy import DDL, column, event, func, literal_column, select, table, text
+# Registers the typed to_tsvector/to_tsquery/ts_headline functions, which
+# must happen before expressions using them are built
+from sqlalchemy.dialects import postgresql  # noqa: F401
+
+# Stemming/stop-word configuration for Postgres text search
+SEARCH_LANGUAGE = 'english'
+
+# Longer queries are cut to this many words
+MAX_SEARCH_TERMS = 8
+
+# On SQLite only the newest this-many matches the user can see are ranked and
+# returned: bm25() costs about a microsecond per matching row, which adds up
+# for words found in most posts
+RANKED_CANDIDATES = 2000
+
+# Matched words in snippets are wrapped in these control characters by the
+# database, then swapped for <mark> tags once the rest is HTML-escaped
+_START, _STOP = '\x02', '\x03'
+
+# SQLite: an FTS5 index over post title and content. It is an external
+# content table (the text lives only in post), kept in sync by triggers, so
+# ORM writes and bulk UPDATE/DELETE statements alike are indexed.
+SQLITE_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5(
+        title, content, content='post', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS post_fts_insert AFTER INSERT ON post BEGIN
+        INSERT INTO post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS post_fts_delete AFTER DELETE ON post BEGIN
+        INSERT INTO post_fts(post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS post_fts_update AFTER UPDATE OF title, content ON post BEGIN
+        INSERT INTO post_fts(post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+_post_fts = table('post_fts', column('rowid'))
+
+
+def install_search_ddl(post_table):
+    """Create the SQLite search index along with the post table (and drop it with it)"""
+    for statement in SQLITE_SEARCH_DDL:
+        event.listen(post_table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    event.listen(post_table, 'before_drop', DDL('DROP TABLE IF EXISTS post_fts').execute_if(dialect='sqlite'))
+
+
+def rebuild_search_index(session, postgres_index):
+    """Create the search index if an existing database lacks it, then rebuild it from post"""
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            session.execute(text(statement))
+        session.execute(text("INSERT INTO post_fts(post_fts) VALUES ('rebuild')"))
+    elif dialect == 'postgresql':
+        postgres_index.create(session.connection(), checkfirst=True)
+        session.execute(text(f'REINDEX INDEX {postgres_index.name}'))
+    session.commit()
+
+
+def search_terms(query_text):
+    """Split a user's query into plain words; operators and punctuation are dropped"""
+    return re.findall(r'\w+', query_text.lower())[:MAX_SEARCH_TERMS]
+
+
+def _search_config():
+    return text(f"'{SEARCH_LANGUAGE}'::regconfig")
+
+
+def post_search_vector(post):
+    """The tsvector the Postgres GIN index is built on.
+
+    Queries must use this identical expression for the index to apply, so
+    its constants are inlined rather than sent as bound parameters.
+    """
+    return func.to_tsvector(
+        _search_config(),
+        func.coalesce(post.title, text("''")) + text("' '") + func.coalesce(post.content, text("''"))
+    )
+
+
+def apply_post_search(query, session, post, terms):
+    """Keep posts matching every term (the last as a prefix) and add score and snippet columns, best first.
+
+    Uses FTS5 on SQLite and the tsvector index on Postgres. Other databases
+    get an unindexed LIKE scan with no ranking or snippet. ``query`` should
+    already carry its visibility filters: on SQLite they also pick the
+    RANKED_CANDIDATES matches that are ranked.
+    """
+    dialect = session.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        matches = literal_column('post_fts').op('MATCH')(match)
+        score = -func.bm25(literal_column('post_fts'), 10.0, 1.0)  # title matches weigh more
+        snippet = func.snippet(literal_column('post_fts'), -1, _START, _STOP, '…', 24)
+        # FTS5 walks matches in rowid order cheaply, so the cut-off is a
+        # rowid range rather than a scored subquery. The query's own filters
+        # apply inside it, or posts the user cannot see would use up the
+        # candidates and hide older visible matches.
+        newest = select(_post_fts.c.rowid).join(post, post.id == _post_fts.c.rowid).where(
+            matches, *([query.whereclause] if query.whereclause is not None else [])
+        ).order_by(_post_fts.c.rowid.desc()).limit(RANKED_CANDIDATES).subquery()
+        query = query.join(_post_fts, _post_fts.c.rowid == post.id).filter(
+            matches,
+            _post_fts.c.rowid >= select(func.min(newest.c.rowid)).scalar_subquery()
+        )
+    elif dialect == 'postgresql':
+        ts_query = func.to_tsquery(_search_config(), ' & '.join(terms) + ':*')
+        score = func.ts_rank_cd(post_search_vector(post), ts_query)
+        snippet = func.ts_headline(
+            _search_config(), post.content, ts_query,
+            f'StartSel={_START}, StopSel={_STOP}, MaxWords=24, MinWords=12'
+        )
+        query = query.filter(post_search_vector(post).op('@@')(ts_query))
+    else:
+        score = literal_column('0')
+        snippet = literal_column('NULL')
+        for term in terms:
+            pattern = f'%{term}%'
+            query = query.filter(post.title.ilike(pattern) | post.content.ilike(pattern))
+
+    return query.add_columns(score.label('score'), snippet.label('snippet')).order_by(
+        score.desc(), post.id.desc()
+    )
+
+
+def highlight(snippet):
+    """HTML-escape a snippet and mark the matched words"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_START, '<mark>').replace(_STOP, '</mark>')
@@ -0,0 +1,17 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Dialects whose insert() supports ON CONFLICT DO NOTHING / DO UPDATE
+_CONFLICT_INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def conflict_insert(session, model):
+    """Get an INSERT for ``model`` that supports ON CONFLICT on the session's database.
+
+    Returns None for databases without ON CONFLICT so callers can fall back
+    to a portable query.
+    """
+    insert = _CONFLICT_INSERTS.get(session.get_bind().dialect.name)
+    return insert(model) if insert else None
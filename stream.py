@@ -0,0 +1,59 @@
+from flask import Blueprint, Response, jsonify
+from flask_login import login_required, current_user
+from src.utils.pubsub import BrokerFull, vote_broker
+import json
+import time
+
+stream_bp = Blueprint('stream', __name__)
+
+# At most one batch per connection per BATCH_INTERVAL seconds
+BATCH_INTERVAL = 1.0
+# Comment lines keep idle connections open through proxies
+HEARTBEAT_INTERVAL = 15.0
+
+def vote_events(subscription):
+    """Yield coalesced vote batches for a subscription as server-sent events"""
+    try:
+        yield 'retry: 5000\n\n'
+        last_batch = 0.0
+        while True:
+            if not subscription.wait(HEARTBEAT_INTERVAL):
+                yield ': keepalive\n\n'
+                continue
+
+            # Let further votes pile up (and coalesce) until the window ends
+            delay = BATCH_INTERVAL - (time.monotonic() - last_batch)
+            if delay > 0:
+                time.sleep(delay)
+
+            messages, overflowed = subscription.drain()
+            last_batch = time.monotonic()
+            if overflowed:
+                # Updates were dropped; the client should refetch
+                yield 'event: resync\ndata: {}\n\n'
+
+            counts = [message for message in messages if message['type'] == 'count']
+            leaderboards = [message for message in messages if message['type'] == 'leaderboard']
+            if counts or leaderboards:
+                payload = {
+                    'counts': [{key: message[key] for key in ('post_id', 'month', 'vote_count')} for message in counts],
+                    'top_articles': {message['grade_level']: message['top_articles'] for message in leaderboards}
+                }
+                yield f'event: votes\ndata: {json.dumps(payload)}\n\n'
+    finally:
+        vote_broker.unsubscribe(subscription)
+
+@stream_bp.route('/stream/votes', methods=['GET'])
+@login_required
+def stream_votes():
+    """Stream live vote counts and top-article changes for the user's grade levels"""
+    try:
+        subscription = vote_broker.subscribe(current_user.get_accessible_grades() + ['all'])
+    except BrokerFull:
+        return jsonify({'error': 'Too many live connections, please poll instead'}), 503
+
+    return Response(
+        vote_events(subscription),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
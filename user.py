@@ -1,10 +1,30 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from flask_login import UserMixin
+from src.utils.cache import InMemoryCache, bump_version, bump_version_after_commit, get_versions
+from src.utils.passwords import hash_password_bounded, needs_rehash, verify_password
 
 db = SQLAlchemy()
 
+# (user id, 'identities' version) -> UserIdentity for the Flask-Login user
+# loader. Write paths that change a user bump the version, so a deactivation
+# ends access everywhere. The TTL bounds memory and the life of an entry if a
+# bump is lost.
+IDENTITY_TTL = 60
+_identities = InMemoryCache(max_entries=10000, default_ttl=IDENTITY_TTL)
+
+# The 'identities' version itself is re-read at most once per
+# IDENTITY_VERSION_TTL seconds, so most requests run no query at all. A
+# change made by another process takes effect here within that delay; the
+# process that made it sees it at once.
+IDENTITY_VERSION_TTL = 1
+_identity_version = InMemoryCache(max_entries=1, default_ttl=IDENTITY_VERSION_TTL)
+
+# The columns a UserIdentity holds: what authorization and to_dict() need
+IDENTITY_FIELDS = (
+    'id', 'username', 'email', 'role', 'grade_level', 'first_name', 'last_name', 'created_at', 'is_active'
+)
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -22,12 +42,16 @@ class User(UserMixin, db.Model):
     votes = db.relationship('Vote', backref='user', lazy=True)
 
     def set_password(self, password):
-        """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        """Set password hash; raises PasswordBusy when the password executor is saturated"""
+        self.password_hash = hash_password_bounded(password)
 
     def check_password(self, password):
-        """Check password against hash"""
-        return check_password_hash(self.password_hash, password)
+        """Check password against hash; raises PasswordBusy when the password executor is saturated"""
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """Check if the password hash was made with outdated parameters"""
+        return needs_rehash(self.password_hash)
 
     def can_post(self):
         """Check if user can create posts"""
@@ -41,6 +65,97 @@ class User(UserMixin, db.Model):
         """Check if user can vote on articles"""
         return self.is_active
 
+    @staticmethod
+    def prefix_search_filter(term):
+        """Match users whose username, first or last name, or email starts with ``term``, ignoring case.
+
+        Each prefix is a range on lower(column), which the lower() expression
+        indexes below can answer directly (LIKE is not indexable everywhere).
+        """
+        prefix = term.lower()
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return db.or_(*[
+            db.and_(db.func.lower(column) >= prefix, db.func.lower(column) < upper)
+            for column in (User.username, User.first_name, User.last_name, User.email)
+        ])
+
+    @staticmethod
+    def directory_query(role=None, grade_level=None, is_active=None, search=None):
+        """Build the admin user directory query; every search word must prefix-match a field"""
+        query = User.query
+        
+        if role:
+            query = query.filter(User.role == role)
+        if grade_level:
+            query = query.filter(User.grade_level == grade_level)
+        if is_active is not None:
+            query = query.filter(User.is_active == is_active)
+        for term in (search or '').split():
+            query = query.filter(User.prefix_search_filter(term))
+        
+        return query
+
+    @staticmethod
+    def delete_where(conditions, transfer_to=None):
+        """Delete matching users and their votes with set-based statements.
+
+        Vote tallies are decremented by the votes removed. Users who still
+        author posts must be excluded by ``conditions`` (their posts would
+        block the delete). About page edits are credited to ``transfer_to``,
+        which is required if any matching user made one. Returns the number
+        of users deleted; the caller commits.
+        """
+        from src.models.vote import Vote
+        from src.models.job import Job
+        from src.models.about import About
+        
+        targets = db.select(User.id).where(*conditions)
+        Vote.delete_where([Vote.user_id.in_(targets)])
+        db.session.execute(
+            db.update(Job).where(Job.created_by.in_(targets)).values(created_by=None)
+            .execution_options(synchronize_session=False)
+        )
+        if transfer_to is not None:
+            for column in (About.created_by, About.updated_by):
+                db.session.execute(
+                    db.update(About).where(column.in_(targets)).values({column.key: transfer_to})
+                    .execution_options(synchronize_session=False)
+                )
+            bump_version_after_commit(db.session, 'about')
+        return db.session.execute(
+            db.delete(User).where(*conditions).execution_options(synchronize_session=False)
+        ).rowcount
+
+    @staticmethod
+    def get_identity(user_id):
+        """Get the cached UserIdentity for a user id, loading its IDENTITY_FIELDS on a miss"""
+        version = _identity_version.get('identities')
+        if version is None:
+            version, = get_versions('identities')
+            _identity_version.set('identities', version)
+        key = (user_id, version)
+        identity = _identities.get(key)
+        if identity is None:
+            row = db.session.query(*[getattr(User, field) for field in IDENTITY_FIELDS]).filter(
+                User.id == user_id
+            ).first()
+            if row is None:
+                return None
+            identity = UserIdentity(*row)
+            _identities.set(key, identity)
+        return identity
+
+    @staticmethod
+    def forget_identities():
+        """Invalidate cached identities in every process once users change.
+
+        Call after committing. User edits are rare admin actions, so one
+        shared version covers all users, bulk updates by filter included.
+        Other processes notice within IDENTITY_VERSION_TTL seconds.
+        """
+        bump_version('identities')
+        _identity_version.delete('identities')
+
     def get_accessible_grades(self):
         """Get list of grade levels user can access"""
         if self.role == 'admin':
@@ -64,3 +179,40 @@ class User(UserMixin, db.Model):
             'is_active': self.is_active
         }
 
+
+class UserIdentity:
+    """The fields authorization and the profile need, standing in for User as current_user.
+
+    Kept by the user loader between requests so most requests run no user
+    query. Permission checks and to_dict() are User's own methods.
+    """
+
+    __slots__ = IDENTITY_FIELDS
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, *values):
+        for field, value in zip(IDENTITY_FIELDS, values):
+            setattr(self, field, value)
+
+    def get_id(self):
+        return str(self.id)
+
+    can_post = User.can_post
+    can_moderate = User.can_moderate
+    can_vote = User.can_vote
+    get_accessible_grades = User.get_accessible_grades
+    to_dict = User.to_dict
+
+    def __repr__(self):
+        return f'<UserIdentity {self.id}>'
+
+
+# Directory filters and case-insensitive prefix search
+db.Index('ix_user_role_grade_level', User.role, User.grade_level)
+db.Index('ix_user_grade_level', User.grade_level)
+db.Index('ix_user_username_lower', db.func.lower(User.username))
+db.Index('ix_user_first_name_lower', db.func.lower(User.first_name))
+db.Index('ix_user_last_name_lower', db.func.lower(User.last_name))
+db.Index('ix_user_email_lower', db.func.lower(User.email))
@@ -1,6 +1,15 @@
 from src.models.user import db
+from src.models.post_vote_tally import PostVoteTally
+from src.utils.cache import InMemoryCache, get_versions
+from src.utils.sql import conflict_insert
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
+# (user_id, month, version) -> set of voted post ids. The version is the
+# user's shared votes scope, bumped whenever their votes change, so no
+# process serves a set from before a vote recorded by another.
+_voted_post_ids = InMemoryCache(max_entries=10000, default_ttl=300)
+
 class Vote(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -9,7 +18,10 @@ class Vote(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Ensure one vote per user per post per month
-    __table_args__ = (db.UniqueConstraint('user_id', 'post_id', 'vote_month', name='unique_user_post_month_vote'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'post_id', 'vote_month', name='unique_user_post_month_vote'),
+        db.Index('ix_vote_vote_month_id', 'vote_month', 'id'),
+    )
 
     @staticmethod
     def get_current_month():
@@ -17,16 +29,102 @@ class Vote(db.Model):
         return datetime.utcnow().strftime('%Y-%m')
 
     @staticmethod
-    def user_has_voted_this_month(user_id, post_id, month=None):
+    def version_scope(user_id):
+        """Get the cache version scope of a user's votes"""
+        return f'votes:{user_id}'
+
+    @staticmethod
+    def user_has_voted_this_month(user_id, post_id, month=None, version=None):
         """Check if user has already voted for this post this month"""
+        return post_id in Vote.get_voted_post_ids(user_id, month, version)
+
+    @staticmethod
+    def record_vote(user_id, post_id, month=None):
+        """Insert a vote unless the user already voted for the post this month.
+
+        The insert itself resolves the unique constraint (ON CONFLICT DO
+        NOTHING where supported), so concurrent duplicate clicks can't fail
+        with an IntegrityError. Returns the post's new monthly count, or None
+        when the vote already existed. The caller commits.
+        """
+        if month is None:
+            month = Vote.get_current_month()
+        
+        insert = conflict_insert(db.session, Vote)
+        if insert is not None:
+            result = db.session.execute(
+                insert.values(user_id=user_id, post_id=post_id, vote_month=month).on_conflict_do_nothing(
+                    index_elements=['user_id', 'post_id', 'vote_month']
+                )
+            )
+            if result.rowcount != 1:
+                return None
+        else:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(Vote(user_id=user_id, post_id=post_id, vote_month=month))
+            except IntegrityError:
+                return None
+        
+        return PostVoteTally.increment(post_id, month)
+
+    @staticmethod
+    def get_voted_post_ids(user_id, month=None, version=None):
+        """Get the ids of all posts a user has voted for in a month.
+
+        Loaded with one query per user, month and version of the user's
+        votes scope, then served from an LRU cache. Pass ``version`` when
+        the caller has already read it. The returned set is shared and must
+        not be modified.
+        """
         if month is None:
             month = Vote.get_current_month()
+        if version is None:
+            version, = get_versions(Vote.version_scope(user_id))
+        
+        voted_post_ids = _voted_post_ids.get((user_id, month, version))
+        if voted_post_ids is None:
+            rows = db.session.query(Vote.post_id).filter_by(
+                user_id=user_id,
+                vote_month=month
+            ).all()
+            voted_post_ids = {row.post_id for row in rows}
+            _voted_post_ids.set((user_id, month, version), voted_post_ids)
+        return voted_post_ids
+
+    @staticmethod
+    def delete_where(conditions):
+        """Delete matching votes and take them off the post tallies, with set-based statements.
+
+        Returns the number of votes deleted; the caller commits.
+        """
+        removed_votes = db.and_(
+            Vote.post_id == PostVoteTally.post_id,
+            Vote.vote_month == PostVoteTally.month,
+            *conditions
+        )
+        db.session.execute(
+            db.update(PostVoteTally).where(db.exists().where(removed_votes)).values(
+                count=PostVoteTally.count - db.select(db.func.count(Vote.id)).where(removed_votes).scalar_subquery()
+            ).execution_options(synchronize_session=False)
+        )
+        return db.session.execute(
+            db.delete(Vote).where(*conditions).execution_options(synchronize_session=False)
+        ).rowcount
+
+    @staticmethod
+    def get_vote_counts_for_posts(post_ids, month):
+        """Get {post_id: (monthly_count, total_count)} for several posts in one query"""
+        if not post_ids:
+            return {}
+        
+        rows = db.session.query(
+            PostVoteTally.post_id,
+            db.func.sum(db.case((PostVoteTally.month == month, PostVoteTally.count), else_=0)).label('monthly_count'),
+            db.func.sum(PostVoteTally.count).label('total_count')
+        ).filter(PostVoteTally.post_id.in_(post_ids)).group_by(PostVoteTally.post_id).all()
         
-        return Vote.query.filter_by(
-            user_id=user_id,
-            post_id=post_id,
-            vote_month=month
-        ).first() is not None
+        return {row.post_id: (int(row.monthly_count or 0), int(row.total_count or 0)) for row in rows}
 
     @staticmethod
     def get_monthly_vote_counts(month, grade_level=None):
@@ -37,9 +135,10 @@ class Vote(db.Model):
             Post.id,
             Post.title,
             Post.grade_level,
-            db.func.count(Vote.id).label('vote_count')
-        ).join(Vote, Post.id == Vote.post_id).filter(
-            Vote.vote_month == month,
+            PostVoteTally.count.label('vote_count')
+        ).join(PostVoteTally, Post.id == PostVoteTally.post_id).filter(
+            PostVoteTally.month == month,
+            PostVoteTally.count > 0,
             Post.post_type == 'article',
             Post.is_published == True
         )
@@ -47,7 +146,7 @@ class Vote(db.Model):
         if grade_level:
             query = query.filter(Post.grade_level == grade_level)
         
-        return query.group_by(Post.id).order_by(db.desc('vote_count')).all()
+        return query.order_by(db.desc('vote_count')).all()
 
     def __repr__(self):
         return f'<Vote user_id={self.user_id} post_id={self.post_id} month={self.vote_month}>'
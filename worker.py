@@ -0,0 +1,135 @@
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# JOB_MODE 'thread' runs jobs on a small pool inside the web process as soon
+# as they are queued. 'external' only queues them for `flask run-worker`,
+# which is required where the web process is frozen or killed after
+# responding: Netlify functions run on AWS Lambda, so 'external' is the
+# default wherever Lambda's environment is present.
+DEFAULT_JOB_MODE = 'external' if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') else 'thread'
+DEFAULT_JOB_THREADS = 2
+
+# Running jobs that report no progress for this long are handed to another worker
+STALE_AFTER = 600
+
+_handlers = {}
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def job_handler(kind):
+    """Register ``func(params, progress)`` as the handler for jobs of ``kind``.
+
+    ``progress(current, total=None, message=None)`` records how far the job
+    has got; it commits the session. The handler's return value must be JSON
+    serializable and becomes the job's result.
+    """
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def get_job_mode():
+    return current_app.config.get('JOB_MODE', DEFAULT_JOB_MODE)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}'
+
+
+def run_job(job):
+    """Run an already claimed job with its handler and store the outcome"""
+    from src.models.user import db
+    from src.models.job import Job
+
+    handler = _handlers.get(job.kind)
+    if handler is None:
+        Job.fail(job.id, f'No handler registered for job kind {job.kind!r}')
+        return
+
+    def progress(current, total=None, message=None):
+        Job.report_progress(job.id, current, total, message)
+
+    try:
+        result = handler(job.get_params(), progress)
+    except Exception as e:
+        logger.exception('Job %s (%s) failed', job.id, job.kind)
+        db.session.rollback()
+        Job.fail(job.id, e)
+    else:
+        Job.finish(job.id, result)
+
+
+def _run_in_thread(app, job_id):
+    from src.models.user import db
+    from src.models.job import Job
+
+    with app.app_context():
+        try:
+            if Job.claim(job_id, worker_name()):
+                run_job(db.session.get(Job, job_id))
+        finally:
+            db.session.remove()
+
+
+def submit(job):
+    """Start a freshly queued job in this process when JOB_MODE is 'thread'.
+
+    In 'external' mode the job just waits in the table for a worker process.
+    """
+    global _executor
+
+    if get_job_mode() != 'thread':
+        return
+    with _executor_lock:
+        if _executor is None:
+            max_workers = current_app.config.get('JOB_THREADS', DEFAULT_JOB_THREADS)
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+    _executor.submit(_run_in_thread, current_app._get_current_object(), job.id)
+
+
+def enqueue_job(kind, params=None, created_by=None):
+    """Queue a job for a registered handler and hand it to a worker"""
+    from src.models.job import Job
+
+    if kind not in _handlers:
+        raise ValueError(f'Unknown job kind: {kind}')
+    job = Job.enqueue(kind, params, created_by)
+    submit(job)
+    return job
+
+
+def run_worker(poll_interval=2.0, once=False):
+    """Claim and run queued jobs until interrupted (or the queue is empty, with ``once``).
+
+    Any number of worker processes can share a database: a job is only run
+    by the worker whose claiming UPDATE succeeds.
+    """
+    from src.models.user import db
+    from src.models.job import Job
+
+    name = worker_name()
+    while True:
+        # Jobs whose worker vanished (a frozen function, a killed process)
+        # are picked up again on the next poll
+        requeued = Job.requeue_stale(STALE_AFTER)
+        if requeued:
+            logger.warning('Requeued %s stale jobs', requeued)
+
+        job = Job.claim_next(name)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        logger.info('Running job %s (%s)', job.id, job.kind)
+        run_job(job)
+        db.session.remove()